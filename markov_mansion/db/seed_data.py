@@ -1,15 +1,14 @@
 import json
 from src.game_logic import Mansion, Ghost
+from src.simulator import GhostSimulator
 
-def create_seed_data(filename="data/historical_movements.json"):
+def create_seed_data(filename="data/historical_movements.json", seed=None):
     mansion = Mansion()
     ghost = Ghost(mansion)
     
     # Simulate a long walk to capture the "Statistical Norm"
-    walk_history = [mansion.room_to_idx[ghost.current_room]]
-    for _ in range(10000):
-        room = ghost.move()
-        walk_history.append(mansion.room_to_idx[room])
+    simulator = GhostSimulator(mansion, seed=seed)
+    walk_history = simulator.walk(1, 10000, start=ghost.current_room)[:, 0].tolist()
         
     data = {
         "metadata": {"total_steps": len(walk_history)},
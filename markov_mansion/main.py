@@ -1,22 +1,24 @@
 import numpy as np
-import json
 from src.game_logic import Mansion, Ghost
 from src.model import MarkovPredictor
 from src.solver import DetectiveSolver
+from src.simulator import GhostSimulator
+from src.tracking import GhostTracker, SensorModel
+from src.drift import DriftMonitor
+from src.planner import TrapPlanner
+from src.movement_log import MovementLog, convert_json_log, log_is_stale
 from db.seed_data import create_seed_data
 import os
 
-def generate_historical_data(mansion, ghost, n_entries=5000):
+def generate_historical_data(mansion, ghost, n_entries=5000, seed=None):
     """
     Simulates the ghost moving through the mansion for a long period
     to generate training data for our Markov model.
     """
     print(f"📡 Generating {n_entries} historical movement logs...")
-    history = []
-    for _ in range(n_entries):
-        room = ghost.move()
-        history.append(mansion.room_to_idx[room])
-    return history
+    simulator = GhostSimulator(mansion, seed=seed)
+    walk = simulator.walk(1, n_entries, start=ghost.current_room)
+    return walk[1:, 0]
 
 def main():
     # 1. Initialization
@@ -29,9 +31,20 @@ def main():
     model.train(history)
     print("✅ Model trained. Transition Matrix stabilized.")
 
+    chain = model.analyze()
+    if not chain["irreducible"]:
+        print(f"⚠️  Chain is reducible ({chain['n_classes']} communicating classes); no unique steady state.")
+    elif not chain["ergodic"]:
+        print(f"⚠️  Chain is periodic (period {chain['period']}); predictions alternate and never settle.")
+    else:
+        print(f"🌀 Chain is ergodic; predictions reach the steady state after ~{chain['mixing_time']} steps.")
+
     # 3. Game Phase (Live Tracking)
     live_ghost = Ghost(mansion, start_room="Foyer")
     solver = DetectiveSolver(mansion, model)
+    # Sightings are noisy and sometimes missing; track a belief instead
+    sensor = SensorModel(mansion, hit_rate=0.7, confusion=0.15, false_alarm=0.02)
+    tracker = GhostTracker(model, sensor)
     
     print("\n" + "="*50)
     print("🕵️‍♂️ WELCOME TO MARKOV'S MANSION: THE LIVE HUNT")
@@ -39,12 +52,16 @@ def main():
 
     # Simulate 5 rounds of the game
     for turn in range(1, 6):
-        current_loc = live_ghost.current_room
-        print(f"\n[Turn {turn}] Ghost last spotted in: **{current_loc}**")
+        sighting = sensor.sample(live_ghost.current_room)
+        tracker.update(sighting)
+        if sighting is None:
+            print(f"\n[Turn {turn}] No sighting this turn")
+        else:
+            print(f"\n[Turn {turn}] Sensor reports the ghost in: **{sighting}**")
         
-        # Predict 2 steps ahead
+        # Predict 2 steps ahead from the current belief
         k = 2
-        recommendations, entropy = solver.recommend_traps(current_loc, k_steps=k)
+        recommendations, entropy = solver.recommend_traps(tracker.belief, k_steps=k)
         
         print(f"📊 Analysis: Entropy (Uncertainty) = {entropy:.2f}")
         print(f"🔮 Prediction for {k} steps ahead:")
@@ -53,16 +70,41 @@ def main():
         
         # Move the ghost for the next turn
         live_ghost.move()
+        tracker.predict()
+
+    # Traps persist: plan a limited set for the next few moves at once
+    planner = TrapPlanner(mansion, model, horizon=5, budget=2)
+    plan = planner.plan(tracker.belief)
+    print(f"\n🪤 Trap plan for the next {planner.horizon} moves: {', '.join(plan['traps'])}"
+          f" ({plan['capture_probability'] * 100:.1f}% capture chance)")
 
     print("\n" + "="*50)
     print("Hunt complete. Check the logs for model drift analysis.")
 
+    # 4. Drift Watch: the ghost picks up a habit (Library -> Study only)
+    habits = model.transition_matrix.copy()
+    library = mansion.room_to_idx['Library']
+    habits[library] = 0
+    habits[library, mansion.room_to_idx['Study']] = 1
+    monitor = DriftMonitor(model, threshold=0.3)
+    changed_ghost = GhostSimulator(mansion, transition_matrix=habits)
+    events = monitor.observe_many(changed_ghost.walk(1, 3000)[:, 0])
+    if events:
+        first = events[0]
+        print(f"🚨 Drift detected after {first['step']} moves in: {', '.join(first['rooms'])}")
+        monitor.refit(first)
+        print("🔧 Retrained only the drifted rows.")
+    else:
+        print("✅ No drift detected.")
+
     if not os.path.exists('data/historical_movements.json'):
         create_seed_data() # Generate if missing
     
-    with open('data/historical_movements.json', 'r') as f:
-        history = json.load(f)['movements']
-        model.train(history)
+    # Stream the binary copy of the history instead of json-loading it;
+    # reconvert whenever the JSON changed since the copy was made
+    if log_is_stale('data/historical_movements.json', 'data/historical_movements.mmlog'):
+        convert_json_log('data/historical_movements.json', 'data/historical_movements.mmlog', mansion.rooms)
+    MovementLog('data/historical_movements.mmlog').train(model)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
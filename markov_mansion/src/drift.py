@@ -0,0 +1,171 @@
+import numpy as np
+
+# Decayed weights are stored multiplied by decay^-t; rescale before they overflow
+_RESCALE_AT = 1e200
+
+
+class DriftMonitor:
+    """
+    Online drift detection for a trained MarkovPredictor.
+
+    Every observed movement updates two views of the recent transitions in
+    O(1): exponentially decayed counts (each transition weighs
+    decay^(age), via one global scale factor instead of decaying every
+    entry) and exact counts over a sliding window (a ring buffer of the
+    last `window` transitions). Every `check_every` movements each row's
+    recent distribution is compared with the model's long-run row by KL
+    divergence or a chi-square statistic; rows over the threshold raise a
+    drift event naming the affected rooms, which refit() can retrain in
+    place.
+    """
+
+    def __init__(self, model, window=1000, half_life=500, threshold=0.1, metric="kl",
+                 source="window", min_row_count=30, check_every=100, epsilon=1e-4):
+        """
+        Args:
+            model: The MarkovPredictor whose matrix is the long-run reference.
+            window: Number of most recent transitions in the windowed counts.
+            half_life: Movements after which a transition's decayed weight halves.
+            threshold: Divergence above which a row counts as drifted.
+            metric: 'kl' (KL(recent || long-run), in nats) or 'chi2'
+                (Pearson statistic divided by the row's recent count).
+            source: Which recent counts to compare, 'window' or 'decayed'.
+            min_row_count: Rows with less recent evidence are not judged.
+            check_every: Movements between automatic checks (0 disables).
+            epsilon: Floor for long-run probabilities, so unseen moves count
+                as very unlikely rather than impossible.
+        """
+        if metric not in ("kl", "chi2"):
+            raise ValueError(f"Unknown metric: {metric}")
+        if source not in ("window", "decayed"):
+            raise ValueError(f"Unknown source: {source}")
+        self.model = model
+        self.window = window
+        self.decay = 0.5 ** (1 / half_life)
+        self.threshold = threshold
+        self.metric = metric
+        self.source = source
+        self.min_row_count = min_row_count
+        self.check_every = check_every
+        self.epsilon = epsilon
+
+        # Decayed counts: true weight = stored * _scale
+        self.decayed = {}
+        self._scale = 1.0
+        # Windowed counts over the ring buffer of (from, to) pairs
+        self.windowed = {}
+        self._ring = np.full((window, 2), -1, dtype=np.int64)
+        self._head = 0
+        self._filled = 0
+
+        self._previous = None
+        self.steps = 0
+        self.events = []
+
+    def observe(self, room):
+        """Feeds one movement (room index; -1 marks a break between walks)."""
+        room = int(room)
+        if room < 0:
+            self._previous = None
+            return None
+        previous, self._previous = self._previous, room
+        self.steps += 1
+        if previous is not None:
+            self._add(previous, room)
+        if self.check_every and self.steps % self.check_every == 0:
+            return self.check()
+        return None
+
+    def observe_many(self, movements):
+        """Feeds a batch of movements; returns the drift events it raised."""
+        raised = []
+        for room in movements:
+            event = self.observe(room)
+            if event is not None:
+                raised.append(event)
+        return raised
+
+    def _add(self, i, j):
+        # Decayed: new weight 1 at the current scale, i.e. 1 / _scale stored
+        self._scale *= self.decay
+        self.decayed[(i, j)] = self.decayed.get((i, j), 0.0) + 1 / self._scale
+        if 1 / self._scale > _RESCALE_AT:
+            # Rare (every few hundred half-lives); also drops long-faded moves
+            self.decayed = {key: value * self._scale for key, value in self.decayed.items()
+                            if value * self._scale > 1e-12}
+            self._scale = 1.0
+
+        # Windowed: evict the transition falling out of the window
+        if self._filled == self.window:
+            old = (int(self._ring[self._head, 0]), int(self._ring[self._head, 1]))
+            self.windowed[old] -= 1
+            if self.windowed[old] == 0:
+                del self.windowed[old]
+        else:
+            self._filled += 1
+        self._ring[self._head] = (i, j)
+        self._head = (self._head + 1) % self.window
+        self.windowed[(i, j)] = self.windowed.get((i, j), 0) + 1
+
+    def recent_counts(self, source=None):
+        """(rows, cols, counts) arrays of the recent transitions."""
+        source = source or self.source
+        if source == "window":
+            items, scale = self.windowed, 1.0
+        else:
+            items, scale = self.decayed, self._scale
+        if not items:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0)
+        keys = np.array(list(items.keys()), dtype=np.int64)
+        counts = np.fromiter(items.values(), dtype=float, count=len(items)) * scale
+        return keys[:, 0], keys[:, 1], counts
+
+    def divergence(self, source=None):
+        """
+        Per-row divergence between the recent and long-run transition rows,
+        and each row's recent count. Rows without recent data score 0.
+        """
+        n = self.model.n
+        rows, cols, counts = self.recent_counts(source)
+        totals = np.bincount(rows, weights=counts, minlength=n)
+        if len(rows) == 0:
+            return np.zeros(n), totals
+
+        recent = counts / totals[rows]
+        long_run = self.model.transition_matrix[rows, cols]
+        long_run = np.maximum(np.asarray(long_run, dtype=float).ravel(), self.epsilon)
+        if self.metric == "kl":
+            terms = recent * np.log(recent / long_run)
+            return np.bincount(rows, weights=terms, minlength=n), totals
+        # Pearson chi-square / row count = sum_j (q - p)^2 / p; cells never
+        # seen recently contribute p each, i.e. 1 minus the seen cells' p
+        terms = (recent - long_run) ** 2 / long_run - long_run
+        return np.bincount(rows, weights=terms, minlength=n) + (totals > 0), totals
+
+    def check(self):
+        """Scores every row now; returns (and records) a drift event or None."""
+        scores, totals = self.divergence()
+        drifted = np.flatnonzero((scores > self.threshold) & (totals >= self.min_row_count))
+        if len(drifted) == 0:
+            return None
+        event = {
+            "step": self.steps,
+            "room_indices": drifted,
+            "rooms": [self.model.states[i] for i in drifted],
+            "divergence": scores[drifted],
+        }
+        self.events.append(event)
+        return event
+
+    def refit(self, event=None, rows=None, source=None):
+        """
+        Retrains only the drifted rows of the model from the recent counts,
+        leaving every other row's long-run counts untouched.
+        """
+        if rows is None:
+            rows = (event or self.events[-1])["room_indices"]
+        rows = np.asarray(rows, dtype=np.int64)
+        r, c, counts = self.recent_counts(source)
+        keep = np.isin(r, rows)
+        self.model.refit_rows(rows, r[keep], c[keep], counts[keep])
@@ -1,27 +1,214 @@
+import json
 import random
+from collections.abc import Mapping, Sequence
 import networkx as nx
-from typing import List, Tuple
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_ADJ_LIST = {
+    'Foyer': ['Hallway', 'Library'],
+    'Library': ['Foyer', 'Study', 'Conservatory'],
+    'Study': ['Library', 'Secret Room'],
+    'Secret Room': ['Study', 'Cellar'],
+    'Cellar': ['Secret Room', 'Kitchen'],
+    'Kitchen': ['Cellar', 'Dining Room'],
+    'Dining Room': ['Kitchen', 'Hallway'],
+    'Hallway': ['Dining Room', 'Foyer', 'Conservatory'],
+    'Conservatory': ['Hallway', 'Library']
+}
+
+class RoomNames(Sequence):
+    """'Room 0', 'Room 1', ... generated on demand for procedural estates."""
+
+    def __init__(self, n: int):
+        self.n = n
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.n))]
+        i = int(i)
+        if i < 0:
+            i += self.n
+        if not 0 <= i < self.n:
+            raise IndexError(i)
+        return f"Room {i}"
+
+    def __iter__(self):
+        return (f"Room {i}" for i in range(self.n))
+
+class RoomIndex(Mapping):
+    """Name -> index lookup for RoomNames, by parsing instead of a dict."""
+
+    def __init__(self, n: int):
+        self.n = n
+
+    def __getitem__(self, room):
+        prefix, _, number = str(room).partition(" ")
+        if prefix == "Room" and number.isdigit() and str(int(number)) == number and int(number) < self.n:
+            return int(number)
+        raise KeyError(room)
+
+    def __iter__(self):
+        return iter(RoomNames(self.n))
+
+    def __len__(self):
+        return self.n
 
 class Mansion:
-    def __init__(self):
+    """
+    The floor plan as a directed graph in CSR form: the rooms reachable from
+    room i are indices[indptr[i]:indptr[i + 1]]. Room names only appear at
+    the API edges (rooms, room_to_idx, get_neighbors); everything else works
+    on integer indices.
+    """
+
+    def __init__(self, adj_list: Optional[Dict[str, List[str]]] = None):
         # Define the rooms and their physical connections
-        self.adj_list = {
-            'Foyer': ['Hallway', 'Library'],
-            'Library': ['Foyer', 'Study', 'Conservatory'],
-            'Study': ['Library', 'Secret Room'],
-            'Secret Room': ['Study', 'Cellar'],
-            'Cellar': ['Secret Room', 'Kitchen'],
-            'Kitchen': ['Cellar', 'Dining Room'],
-            'Dining Room': ['Kitchen', 'Hallway'],
-            'Hallway': ['Dining Room', 'Foyer', 'Conservatory'],
-            'Conservatory': ['Hallway', 'Library']
-        }
-        self.rooms = list(self.adj_list.keys())
-        self.room_to_idx = {room: i for i, room in enumerate(self.rooms)}
-        self.idx_to_room = {i: room for i, room in enumerate(self.rooms)}
+        adj_list = DEFAULT_ADJ_LIST if adj_list is None else adj_list
+        # Rooms only mentioned as neighbors get an index (and no exits) too
+        rooms = list(dict.fromkeys([*adj_list, *(n for neighbors in adj_list.values() for n in neighbors)]))
+        room_to_idx = {room: i for i, room in enumerate(rooms)}
+        degree = [len(adj_list.get(room, [])) for room in rooms]
+        indptr = np.concatenate(([0], np.cumsum(degree))).astype(np.int64)
+        indices = np.array([room_to_idx[n] for room in rooms for n in adj_list.get(room, [])], dtype=np.int64)
+        self._set_graph(indptr, indices, rooms)
+
+    def _set_graph(self, indptr: np.ndarray, indices: np.ndarray, rooms: Optional[List[str]] = None):
+        self.indptr = indptr
+        self.indices = indices
+        if rooms is None:
+            self.rooms = RoomNames(len(indptr) - 1)
+            self.room_to_idx = RoomIndex(len(indptr) - 1)
+            self.idx_to_room = self.rooms
+        else:
+            self.rooms = list(rooms)
+            self.room_to_idx = {room: i for i, room in enumerate(self.rooms)}
+            self.idx_to_room = {i: room for i, room in enumerate(self.rooms)}
+
+    @classmethod
+    def from_csr(cls, indptr, indices, rooms: Optional[List[str]] = None) -> "Mansion":
+        """Wraps existing CSR arrays; rooms default to lazily named 'Room i'."""
+        mansion = cls.__new__(cls)
+        mansion._set_graph(np.asarray(indptr, dtype=np.int64), np.asarray(indices, dtype=np.int64), rooms)
+        return mansion
+
+    @classmethod
+    def from_edges(cls, n_rooms: int, sources, targets, rooms: Optional[List[str]] = None,
+                   directed: bool = False) -> "Mansion":
+        """
+        Builds the CSR arrays from integer edge arrays with one sort. Doors
+        are two-way unless directed; self-loops and duplicates are dropped.
+        """
+        if n_rooms < 0:
+            raise ValueError(f"n_rooms must be non-negative, got {n_rooms}")
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        if sources.shape != targets.shape:
+            raise ValueError("sources and targets must have the same length")
+        if len(sources) and (min(sources.min(), targets.min()) < 0 or max(sources.max(), targets.max()) >= n_rooms):
+            raise ValueError(f"Edge endpoints must be room indices in [0, {n_rooms})")
+        if not directed:
+            sources, targets = np.concatenate((sources, targets)), np.concatenate((targets, sources))
+        keep = sources != targets
+        codes = np.sort(sources[keep] * n_rooms + targets[keep])
+        codes = codes[np.diff(codes, prepend=-1) != 0]
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(codes // n_rooms, minlength=n_rooms))))
+        return cls.from_csr(indptr, codes % n_rooms, rooms)
+
+    @classmethod
+    def from_edge_list(cls, path: str, directed: bool = False, delimiter: Optional[str] = None) -> "Mansion":
+        """
+        Loads a floor plan from a text file with one 'room_a room_b' pair per
+        line ('#' starts a comment). Use a delimiter such as ',' or a tab for
+        names containing spaces. Rooms are numbered in order of appearance.
+        """
+        room_to_idx: Dict[str, int] = {}
+        sources, targets = [], []
+        with open(path) as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if not line:
+                    continue
+                parts = [part.strip() for part in line.split(delimiter)]
+                if len(parts) == 1:
+                    # A room with no doors listed on this line
+                    room_to_idx.setdefault(parts[0], len(room_to_idx))
+                    continue
+                a, b = parts[:2]
+                sources.append(room_to_idx.setdefault(a, len(room_to_idx)))
+                targets.append(room_to_idx.setdefault(b, len(room_to_idx)))
+        return cls.from_edges(len(room_to_idx), sources, targets, list(room_to_idx), directed)
+
+    @classmethod
+    def from_json(cls, path: str) -> "Mansion":
+        """
+        Loads either an adjacency dict ({room: [neighbors]}, as in the default
+        mansion) or {"rooms": [...], "edges": [[a, b], ...], "directed": false}
+        where edge endpoints are room names or indices.
+        """
+        with open(path) as f:
+            data = json.load(f)
+        if "edges" not in data:
+            return cls(data)
+        rooms = list(data.get("rooms") or [])
+        room_to_idx = {room: i for i, room in enumerate(rooms)}
+        edges = [[e if isinstance(e, int) else room_to_idx.setdefault(e, len(room_to_idx)) for e in edge]
+                 for edge in data["edges"]]
+        rooms = list(room_to_idx)
+        n_rooms = len(rooms) or (max(max(edge) for edge in edges) + 1 if edges else 0)
+        edges = np.array(edges, dtype=np.int64).reshape(-1, 2)
+        return cls.from_edges(n_rooms, edges[:, 0], edges[:, 1], rooms or None, data.get("directed", False))
+
+    @classmethod
+    def grid(cls, rows: int, cols: int) -> "Mansion":
+        """A rows x cols block of rooms with doors to the four side neighbors."""
+        cells = np.arange(rows * cols).reshape(rows, cols)
+        sources = np.concatenate((cells[:, :-1].ravel(), cells[:-1, :].ravel()))
+        targets = np.concatenate((cells[:, 1:].ravel(), cells[1:, :].ravel()))
+        return cls.from_edges(rows * cols, sources, targets)
+
+    @classmethod
+    def tree(cls, n_rooms: int, seed=None) -> "Mansion":
+        """A random recursive tree: each new room opens onto a random earlier one."""
+        rng = np.random.default_rng(seed)
+        children = np.arange(1, max(n_rooms, 1))
+        parents = (rng.random(len(children)) * children).astype(np.int64)
+        return cls.from_edges(n_rooms, parents, children)
+
+    @classmethod
+    def small_world(cls, n_rooms: int, k: int = 4, p: float = 0.1, seed=None) -> "Mansion":
+        """
+        Watts-Strogatz layout: a ring where each room connects to its k
+        nearest rooms, with each door rewired to a random room with
+        probability p.
+        """
+        rng = np.random.default_rng(seed)
+        sources = np.repeat(np.arange(n_rooms), k // 2)
+        targets = (sources + np.tile(np.arange(1, k // 2 + 1), n_rooms)) % n_rooms
+        rewire = rng.random(len(targets)) < p
+        targets[rewire] = rng.integers(0, n_rooms, rewire.sum())
+        return cls.from_edges(n_rooms, sources, targets)
+
+    @property
+    def n_rooms(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def adj_list(self) -> Dict[str, List[str]]:
+        """Name-keyed adjacency dict (built on demand; small mansions only)."""
+        return {room: self.get_neighbors(room) for room in self.rooms}
+
+    def neighbor_indices(self, idx: int) -> np.ndarray:
+        """Indices of the rooms reachable from room idx (a view, O(1))."""
+        return self.indices[self.indptr[idx]:self.indptr[idx + 1]]
 
     def get_neighbors(self, room: str) -> List[str]:
-        return self.adj_list.get(room, [])
+        if room not in self.room_to_idx:
+            return []
+        return [self.idx_to_room[i] for i in self.neighbor_indices(self.room_to_idx[room])]
 
 class Ghost:
     def __init__(self, mansion: Mansion, start_room: str = "Foyer"):
@@ -35,4 +222,4 @@ class Ghost:
         """
         neighbors = self.mansion.get_neighbors(self.current_room)
         self.current_room = random.choice(neighbors)
-        return self.current_room
\ No newline at end of file
+        return self.current_room
@@ -1,31 +1,429 @@
+import warnings
+from collections import OrderedDict
+
 import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+
+# Above this many rooms raw counts are kept sparse; n x n dense no longer fits
+DENSE_COUNT_LIMIT = 4096
+# 'auto' backend: go sparse from this many rooms if at most this share of
+# the matrix is non-zero
+SPARSE_MIN_STATES = 512
+SPARSE_MAX_DENSITY = 0.05
+# Short-circuit k-step predictions to the stationary vector once the
+# distance to it is below this (estimated from the spectral gap)
+MIXING_TOLERANCE = 1e-12
+# Below this many steps a plain prediction is cheaper than the spectral
+# analysis, so the short-circuit is not even considered
+STATIONARY_MIN_K = 32
+# Up to this many rooms the spectrum is computed with a full dense eig
+DENSE_EIG_LIMIT = 512
+# Step budget of the power iteration used for larger chains
+POWER_MAX_ITER = 10_000
+# Changes between power iterates below this are too close to rounding noise
+# to resolve the contraction rate
+RATE_RESOLUTION = 1e-7
+
+def is_distribution(start_state):
+    """Whether a prediction start is a probability vector rather than room indices."""
+    return isinstance(start_state, np.ndarray) and start_state.dtype.kind == "f"
 
 class MarkovPredictor:
-    def __init__(self, states):
+    def __init__(self, states, backend="auto", power_cache_size=32, power_cache_bytes=256 * 2**20):
+        """
+        Args:
+            states: Room names (or any sequence with one entry per state).
+            backend: 'dense', 'sparse' (CSR) or 'auto', which picks by the
+                number of rooms and the density of observed transitions.
+            power_cache_size: How many full P^k results the dense backend
+                keeps in its LRU cache.
+            power_cache_bytes: Memory cap on those cached results and the
+                P^(2^i) squarings they are built from; with n rooms each
+                takes 8 n^2 bytes, so large chains keep fewer.
+        """
+        if backend not in ("auto", "dense", "sparse"):
+            raise ValueError(f"Unknown backend: {backend}")
         self.states = states
         self.n = len(states)
-        # Initialize an empty transition matrix
-        self.transition_matrix = np.zeros((self.n, self.n))
+        self.backend = backend
+        # Raw transition counts; the normalized matrix is derived lazily
+        self.counts = self._empty_counts()
+        self._transition_matrix = None
+        self._transposed = None
+        # Dense matrix powers: P^(2^i) from repeated squaring, plus an LRU
+        # of finished P^k results. Both are dropped whenever counts change.
+        self.power_cache_size = power_cache_size
+        self.power_cache_bytes = power_cache_bytes
+        self._squarings = []
+        self._power_cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Structure, stationary distribution and mixing time (see analyze)
+        self._analysis = None
+        # Last room of the previous batch, so consecutive chunks of one
+        # walk also count the transition across the chunk boundary
+        self._last_state = None
+
+    def _empty_counts(self):
+        if self.n > DENSE_COUNT_LIMIT or self.backend == "sparse":
+            return sparse.csr_matrix((self.n, self.n))
+        return np.zeros((self.n, self.n))
 
     def train(self, historical_data):
-        """Builds the transition matrix from move logs."""
-        for i in range(len(historical_data) - 1):
-            current_state = historical_data[i]
-            next_state = historical_data[i+1]
-            self.transition_matrix[current_state][next_state] += 1
-        
-        # Normalize rows to sum to 1
-        row_sums = self.transition_matrix.sum(axis=1)
-        self.transition_matrix = self.transition_matrix / row_sums[:, np.newaxis]
+        """Builds the transition matrix from move logs, replacing any earlier training."""
+        self.counts = self._empty_counts()
+        self._last_state = None
+        self.partial_fit(historical_data)
+
+    def partial_fit(self, movements, continues=True):
+        """
+        Adds a new batch of movements to the raw counts.
+
+        Cost is proportional to the batch, not the whole history: transitions
+        are counted with one np.unique over current * n + next and scattered
+        into the counts (or a duplicate-summing COO build for sparse counts),
+        and the matrix is only renormalized the next time it is read. With
+        continues, the batch is treated as the continuation of the previous
+        one. A negative index marks a break between walks (e.g. separate
+        ghosts); transitions touching it are skipped.
+        """
+        movements = np.asarray(movements, dtype=np.int64)
+        if continues and self._last_state is not None and len(movements):
+            movements = np.concatenate(([self._last_state], movements))
+        if len(movements) == 0:
+            return
+
+        current, following = movements[:-1], movements[1:]
+        valid = (current >= 0) & (following >= 0)
+        current, following = current[valid], following[valid]
+        if sparse.issparse(self.counts):
+            batch = sparse.coo_matrix(
+                (np.ones(len(current)), (current, following)), shape=(self.n, self.n)
+            ).tocsr()
+            self.counts = self.counts + batch
+        else:
+            # Codes are unique, so a plain fancy-index add counts every pair
+            codes, counts = np.unique(current * self.n + following, return_counts=True)
+            self.counts[codes // self.n, codes % self.n] += counts
+
+        self._last_state = int(movements[-1]) if movements[-1] >= 0 else None
+        self._invalidate()
+
+    def refit_rows(self, rows, row_idx, col_idx, counts):
+        """
+        Replaces the raw counts of the given rows with new (row, col, count)
+        triples, e.g. recent counts for rows a DriftMonitor flagged; every
+        other row keeps its long-run counts.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        replacement = sparse.coo_matrix((counts, (row_idx, col_idx)), shape=(self.n, self.n))
+        if sparse.issparse(self.counts):
+            keep = np.ones(self.n)
+            keep[rows] = 0
+            self.counts = sparse.csr_matrix(sparse.diags(keep) @ self.counts + replacement)
+        else:
+            self.counts[rows] = 0
+            self.counts += replacement.toarray()
+        self._invalidate()
+
+    def _invalidate(self):
+        """Drops everything derived from the counts."""
+        self._transition_matrix = None
+        self._transposed = None
+        self._squarings = []
+        self._power_cache.clear()
+        self._analysis = None
+
+    def cache_info(self):
+        """Hit/miss counters and occupancy of the matrix-power cache."""
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "size": len(self._power_cache),
+            "maxsize": self._power_cache_limit(),
+            "nbytes": sum(power.nbytes for power in [*self._squarings[1:], *self._power_cache.values()]),
+            "squarings": len(self._squarings),
+        }
+
+    def matrix_power(self, k):
+        """
+        P^k on the dense backend, served from the LRU cache when possible.
+
+        On a miss P^k is assembled by binary exponentiation from the cached
+        P^(2^i) squarings, so later powers reuse the same squarings. The
+        squarings and the cached results share power_cache_bytes; squarings
+        past the budget are recomputed on each use rather than stored. The
+        result is read-only, since it may be the cached array itself.
+        """
+        cached = self._power_cache.get(k)
+        if cached is not None:
+            self.cache_hits += 1
+            self._power_cache.move_to_end(k)
+            return cached
+
+        self.cache_misses += 1
+        if not self._squarings:
+            # P itself is held anyway, so it is not charged to the budget
+            self._squarings.append(self.transition_matrix)
+        kept = 1 + self._power_cache_bytes_left()
+        result = np.eye(self.n)
+        power = None
+        bit = 0
+        while (k >> bit) > 0:
+            if bit < len(self._squarings):
+                power = self._squarings[bit]
+            else:
+                power = power @ power
+                power.setflags(write=False)
+                if len(self._squarings) < kept:
+                    self._squarings.append(power)
+            if (k >> bit) & 1:
+                result = result @ power
+            bit += 1
+        result.setflags(write=False)
+
+        limit = self._power_cache_limit()
+        if limit > 0:
+            self._power_cache[k] = result
+            while len(self._power_cache) > limit:
+                self._power_cache.popitem(last=False)
+        return result
+
+    def _power_cache_bytes_left(self):
+        """Dense n x n matrices power_cache_bytes holds beyond the stored squarings."""
+        matrices = self.power_cache_bytes // (8 * self.n * self.n)
+        return max(0, matrices - max(0, len(self._squarings) - 1))
+
+    def _power_cache_limit(self):
+        """Cached P^k results allowed by both the entry and the byte budget."""
+        return min(self.power_cache_size, self._power_cache_bytes_left())
+
+    @property
+    def is_sparse(self):
+        """Whether predictions run on the CSR backend."""
+        if self.backend != "auto":
+            return self.backend == "sparse"
+        if self._transition_matrix is not None:
+            return sparse.issparse(self._transition_matrix)
+        if self.n < SPARSE_MIN_STATES:
+            return False
+        nnz = self.counts.nnz if sparse.issparse(self.counts) else np.count_nonzero(self.counts)
+        return nnz + self.n <= SPARSE_MAX_DENSITY * self.n * self.n
+
+    @property
+    def transition_matrix(self):
+        """
+        Row-normalized counts (maximum likelihood estimate), as a dense
+        array or a CSR matrix depending on the backend. A room never seen as
+        a starting point keeps its probability mass (self-loop) rather than
+        dividing by zero.
+        """
+        if self._transition_matrix is None:
+            row_sums = np.asarray(self.counts.sum(axis=1)).ravel()
+            unseen = row_sums == 0
+            scale = 1 / np.where(unseen, 1, row_sums)
+            if self.is_sparse:
+                counts = sparse.csr_matrix(self.counts)
+                matrix = sparse.diags(scale) @ counts + sparse.diags(unseen.astype(float))
+                self._transition_matrix = sparse.csr_matrix(matrix)
+            else:
+                counts = self.counts.toarray() if sparse.issparse(self.counts) else self.counts
+                matrix = counts * scale[:, np.newaxis]
+                matrix[unseen, unseen] = 1.0
+                self._transition_matrix = matrix
+        return self._transition_matrix
+
+    @transition_matrix.setter
+    def transition_matrix(self, matrix):
+        # Allows a hand-built matrix; its rows act as the counts
+        self.counts = sparse.csr_matrix(matrix, dtype=float) if sparse.issparse(matrix) else np.array(matrix, dtype=float)
+        self._invalidate()
+
+    def analyze(self):
+        """
+        Long-run behaviour of the chain, computed once per set of counts.
+
+        Returns a dict with:
+            n_classes: number of communicating classes (strongly connected
+                components of the transition graph).
+            irreducible: every room can reach every other room.
+            period: gcd of the cycle lengths (irreducible chains only); a
+                periodic chain, e.g. a bipartite floor plan, alternates
+                between room groups and never settles.
+            ergodic: irreducible and aperiodic, so P^k converges.
+            stationary: the stationary distribution pi (irreducible chains,
+                where it is unique), else None.
+            second_eigenvalue: modulus of the second-largest eigenvalue
+                (None if power iteration could not resolve it).
+            mixing_time: steps after which P^k is within MIXING_TOLERANCE of
+                the stationary rows, estimated as
+                log(tol * min(pi)) / log(|lambda_2|); None unless ergodic.
+        """
+        if self._analysis is not None:
+            return self._analysis
+
+        support = sparse.csr_matrix(self.transition_matrix)
+        support.eliminate_zeros()
+        n_classes, _ = csgraph.connected_components(support, directed=True, connection="strong")
+        irreducible = n_classes == 1
+
+        period = None
+        if irreducible:
+            # BFS levels from room 0; every edge u -> v closes a cycle whose
+            # length differs from level[u] + 1 - level[v] by a multiple of the period
+            levels = csgraph.shortest_path(support, indices=0, unweighted=True).astype(np.int64)
+            rows, cols = support.nonzero()
+            period = int(np.gcd.reduce(np.abs(levels[rows] + 1 - levels[cols])))
+        ergodic = irreducible and period == 1
+
+        stationary, second, mixing_time = None, None, None
+        if irreducible:
+            stationary, second = self._spectrum(ergodic)
+            if ergodic and second is not None:
+                if second < MIXING_TOLERANCE:
+                    mixing_time = 1
+                else:
+                    mixing_time = max(1, int(np.ceil(np.log(MIXING_TOLERANCE * stationary.min()) / np.log(second))))
+
+        self._analysis = {
+            "n_classes": int(n_classes),
+            "irreducible": irreducible,
+            "period": period,
+            "ergodic": ergodic,
+            "stationary": stationary,
+            "second_eigenvalue": second,
+            "mixing_time": mixing_time,
+        }
+        return self._analysis
+
+    def _spectrum(self, ergodic):
+        """
+        Stationary vector and |lambda_2|. Small chains use a full eigen-
+        decomposition of P^T; large ones use power iteration, where the
+        error shrinks by a factor |lambda_2| per step once the other modes
+        have died out, so the observed contraction rate estimates it.
+        """
+        if self.n <= DENSE_EIG_LIMIT:
+            matrix = self.transition_matrix
+            dense = matrix.toarray() if sparse.issparse(matrix) else matrix
+            values, vectors = np.linalg.eig(dense.T)
+            lead = np.argmin(np.abs(values - 1))
+            pi = np.abs(np.real(vectors[:, lead]))
+            others = np.delete(np.abs(values), lead)
+            return pi / pi.sum(), float(others.max()) if len(others) else 0.0
+
+        # A periodic chain only converges in its lazy version (P + I) / 2,
+        # which has the same pi; its other eigenvalues lie on the unit circle
+        pi, rate = self._power_iteration(lazy=not ergodic)
+        return pi, rate if ergodic else 1.0
+
+    def _power_iteration(self, lazy, tol=MIXING_TOLERANCE, max_iter=POWER_MAX_ITER):
+        """
+        Fixed point of v <- v P, plus the last well-resolved contraction rate.
+
+        The step-to-step change understates the remaining error on slowly
+        mixing chains: with contraction rate r the iterate is still about
+        change * r / (1 - r) from the fixed point, so that is what has to
+        fall below tol (the same tolerance the mixing time is measured
+        against). Warns if the iteration runs out of steps first.
+        """
+        if self._transposed is None:
+            self._transposed = sparse.csr_matrix(self.transition_matrix.T)
+        pi = np.full(self.n, 1 / self.n)
+        rate, previous = None, None
+        for _ in range(max_iter):
+            following = self._transposed @ pi
+            if lazy:
+                following = 0.5 * (pi + following)
+            change = np.abs(following - pi).sum()
+            if previous is not None and change > RATE_RESOLUTION:
+                rate = change / previous
+            pi, previous = following, change
+            remaining = change * rate / (1 - rate) if rate is not None and rate < 1 else change
+            if remaining < tol:
+                break
+        else:
+            warnings.warn(
+                f"Power iteration did not converge in {max_iter} steps (last change {change:.1e}); "
+                "the stationary distribution and mixing time are approximate",
+                RuntimeWarning,
+                stacklevel=4,
+            )
+        return pi / pi.sum(), rate
+
+    @property
+    def stationary_distribution(self):
+        """The stationary distribution, or None if the chain is reducible."""
+        stationary = self.analyze()["stationary"]
+        return None if stationary is None else stationary.copy()
+
+    @property
+    def mixing_time(self):
+        """Estimated steps to converge, or None if the chain never converges."""
+        return self.analyze()["mixing_time"]
 
     def predict_k_steps(self, start_state, k):
         """
         Calculates the probability distribution after k steps.
         Uses the property: v_k = v_0 * P^k
+
+        On the sparse backend this is k vector-matrix products from the
+        one-hot start, O(k * nnz), instead of a dense matrix power. For an
+        ergodic chain, any k past the mixing time returns the stationary
+        distribution directly, provided the spectral analysis is already
+        cached or the k steps would cost more than running it.
+
+        start_state may also be a sequence of recent rooms (as for
+        NGramPredictor), of which only the last matters to a first-order
+        chain, or a float probability vector over rooms (e.g. a tracker's
+        belief), or a 2-D block of such vectors, one per row, which are
+        advanced together.
         """
-        initial_dist = np.zeros(self.n)
-        initial_dist[start_state] = 1
-        
-        # Matrix exponentiation for efficiency
-        pk = np.linalg.matrix_power(self.transition_matrix, k)
-        return initial_dist @ pk
\ No newline at end of file
+        if self._stationary_pays(k):
+            mixing_time = self.mixing_time
+            if mixing_time is not None and k >= mixing_time:
+                if is_distribution(start_state):
+                    stationary = self.analyze()["stationary"]
+                    return np.broadcast_to(stationary, start_state.shape).copy()
+                return self.stationary_distribution
+
+        if is_distribution(start_state):
+            if self.is_sparse:
+                return self._propagate(start_state, k)
+            return start_state @ self.matrix_power(k)
+
+        start_state = int(np.atleast_1d(start_state)[-1])
+        if self.is_sparse:
+            initial_dist = np.zeros(self.n)
+            initial_dist[start_state] = 1
+            return self._propagate(initial_dist, k)
+
+        # Matrix exponentiation (cached); v_0 is one-hot, so v_k is a row of P^k
+        return self.matrix_power(k)[start_state].copy()
+
+    def _stationary_pays(self, k):
+        """
+        Whether to consult the spectral analysis for a k-step prediction:
+        always once it is cached, otherwise only if the prediction would cost
+        more than the analysis (both counted in vector-matrix products).
+        """
+        if self._analysis is not None:
+            return True
+        if k < STATIONARY_MIN_K:
+            return False
+        # The dense backend multiplies n x n matrices, about log2(k) of them
+        steps = k if self.is_sparse else self.n * np.log2(k)
+        # A dense eig costs on the order of 10 n^3, i.e. 10 n products
+        analysis = 10 * self.n if self.n <= DENSE_EIG_LIMIT else POWER_MAX_ITER
+        return steps > analysis
+
+    def _propagate(self, dist, k):
+        """k steps of v <- v P using the cached transpose (CSR row access)."""
+        if self._transposed is None:
+            self._transposed = sparse.csr_matrix(self.transition_matrix.T)
+        # A block of distributions is advanced as the columns of its transpose
+        dist = dist.T
+        for _ in range(k):
+            dist = self._transposed @ dist
+        return dist.T
@@ -0,0 +1,162 @@
+import json
+import os
+
+import numpy as np
+
+MAGIC = b"MMLOG\x00\x01\x00"
+# Header: magic, uint32 length of the JSON room table, the JSON, then padding
+# so the index data starts on an 8-byte boundary
+_LENGTH_BYTES = 4
+_ALIGN = 8
+
+
+def _dtype_for(n_rooms):
+    """Smallest unsigned dtype that holds every room index plus the separator."""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if n_rooms < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    raise ValueError(f"Too many rooms for a movement log: {n_rooms}")
+
+
+def _read_header(f):
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"{f.name} is not a movement log")
+    length = int.from_bytes(f.read(_LENGTH_BYTES), "little")
+    header = json.loads(f.read(length).decode())
+    offset = len(MAGIC) + _LENGTH_BYTES + length
+    return header, offset + (-offset) % _ALIGN
+
+
+class MovementLogWriter:
+    """
+    Appends movements to a binary log of room indices.
+
+    The file holds a short header with the room table, then one uint8 /
+    uint16 / uint32 index per movement (whichever fits the room count). The
+    dtype's maximum value is reserved as a separator between ghosts or
+    sessions; in the movement arrays passed in and read back it is -1, as
+    for MarkovPredictor.partial_fit. Appending to an existing log only adds
+    bytes at the end, so a log can grow chunk by chunk across runs.
+    """
+
+    def __init__(self, path, rooms):
+        self.path = path
+        self.rooms = list(rooms)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                header, _ = _read_header(f)
+            if header["rooms"] != self.rooms:
+                raise ValueError(f"{path} was written for a different room table")
+        else:
+            self._write_header()
+        self.dtype = _dtype_for(len(self.rooms))
+        self.separator = np.iinfo(self.dtype).max
+        self._file = open(path, "ab")
+
+    def _write_header(self):
+        header = json.dumps({"version": 1, "rooms": self.rooms, "dtype": _dtype_for(len(self.rooms)).name}).encode()
+        size = len(MAGIC) + _LENGTH_BYTES + len(header)
+        with open(self.path, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(_LENGTH_BYTES, "little"))
+            f.write(header)
+            f.write(b"\x00" * ((-size) % _ALIGN))
+
+    def append(self, movements):
+        """Appends a chunk of room indices; -1 marks a session break."""
+        movements = np.asarray(movements, dtype=np.int64)
+        if len(movements) and movements.max() >= len(self.rooms):
+            raise ValueError("Movement refers to a room outside the room table")
+        encoded = np.where(movements < 0, self.separator, movements).astype(self.dtype)
+        self._file.write(encoded.tobytes())
+
+    def end_session(self):
+        """Marks the boundary between this ghost/session and the next."""
+        self._file.write(np.array([self.separator], dtype=self.dtype).tobytes())
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MovementLog:
+    """
+    Read-only view of a binary movement log through np.memmap; nothing is
+    loaded until a chunk is touched, so training can stream multi-GB logs.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            header, self.offset = _read_header(f)
+        self.rooms = header["rooms"]
+        self.dtype = np.dtype(header["dtype"])
+        self.separator = np.iinfo(self.dtype).max
+        # A torn final write leaves a partial element; ignore it
+        n = (os.path.getsize(path) - self.offset) // self.dtype.itemsize
+        if n > 0:
+            self.data = np.memmap(path, dtype=self.dtype, mode="r", offset=self.offset, shape=(n,))
+        else:
+            self.data = np.empty(0, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.data)
+
+    def iter_chunks(self, chunk_size=1 << 22):
+        """Yields int64 movement arrays with separators decoded as -1."""
+        for start in range(0, len(self.data), chunk_size):
+            chunk = self.data[start:start + chunk_size].astype(np.int64)
+            chunk[chunk == self.separator] = -1
+            yield chunk
+
+    def train(self, model, chunk_size=1 << 22):
+        """
+        Retrains model from the log chunk by chunk. partial_fit carries the
+        last room across chunk boundaries, so the counts equal those of a
+        single pass over the whole log. The log's room table must match
+        model.states name for name, since the log stores room indices.
+        """
+        if len(self.rooms) != model.n:
+            raise ValueError(f"Log has {len(self.rooms)} rooms, model has {model.n}")
+        mismatch = next((i for i, (a, b) in enumerate(zip(self.rooms, model.states)) if a != b), None)
+        if mismatch is not None:
+            raise ValueError(
+                f"Log room {mismatch} is {self.rooms[mismatch]!r}, model room {mismatch} is "
+                f"{model.states[mismatch]!r}; the log was written for a different room table"
+            )
+        model.train([])
+        for chunk in self.iter_chunks(chunk_size):
+            model.partial_fit(chunk)
+        return model
+
+
+def convert_json_log(json_path, log_path, rooms):
+    """
+    Converts a {'movements': [...]} JSON seed file into a binary log. The
+    log is stamped with the source's modification time (see log_is_stale).
+    """
+    with open(json_path) as f:
+        movements = json.load(f)["movements"]
+    if os.path.exists(log_path):
+        os.remove(log_path)
+    with MovementLogWriter(log_path, rooms) as writer:
+        writer.append(movements)
+    source = os.stat(json_path)
+    os.utime(log_path, ns=(source.st_atime_ns, source.st_mtime_ns))
+    return MovementLog(log_path)
+
+
+def log_is_stale(json_path, log_path):
+    """
+    Whether a binary log converted by convert_json_log no longer matches its
+    JSON source: it is missing, or the source was modified (its mtime moved
+    either way, e.g. replaced by an older copy) since the conversion.
+    """
+    if not os.path.exists(log_path):
+        return True
+    return os.stat(json_path).st_mtime_ns != os.stat(log_path).st_mtime_ns
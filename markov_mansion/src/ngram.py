@@ -0,0 +1,249 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import sparse
+
+from src.model import MarkovPredictor, is_distribution
+
+
+class NGramPredictor:
+    """
+    Order-k ghost movement model: the next room depends on the last k rooms.
+
+    Counts live in sorted-array tables rather than a dense n^k x n array.
+    Each context (the last k rooms, packed into one int64 code) owns a run
+    of (next room, count) pairs; pairs are kept sorted by (context, next),
+    so lookups are binary searches and a training batch is sorted on its
+    own and then merged into the tables in one linear pass. When more than
+    max_contexts contexts are stored, the rarest are pruned, and any
+    context missing from the table falls back to the first-order model
+    trained alongside.
+
+    Once a multi-step prediction has fallen back to the first-order chain
+    it only knows the current room, so for order >= 3 it stays there: a
+    first-order state never re-enters a stored context, which would need
+    the last k rooms. At order 1 and 2 the room just left and the room
+    entered pin the context down, so those re-enter directly.
+    """
+
+    def __init__(self, states, order=2, max_contexts=1_000_000):
+        """
+        Args:
+            states: Room names (or any sequence with one entry per state).
+            order: Number of previous rooms the prediction conditions on.
+            max_contexts: Memory cap; beyond it the rarest contexts are pruned.
+        """
+        if order < 1:
+            raise ValueError("Order must be at least 1")
+        self.states = states
+        self.n = len(states)
+        self.order = order
+        if float(self.n) ** order >= 2 ** 63:
+            raise ValueError(f"{self.n} rooms at order {order} overflow the int64 context codes")
+        self.max_contexts = max_contexts
+        self._powers = self.n ** np.arange(order - 1, -1, -1, dtype=np.int64)
+        # First-order chain used whenever a context is unknown (backoff)
+        self.backoff = MarkovPredictor(states)
+        self._reset()
+
+    def _reset(self):
+        # Pair table, sorted by (context code, next room)
+        self.pair_contexts = np.empty(0, dtype=np.int64)
+        self.pair_next = np.empty(0, dtype=np.int64)
+        self.pair_counts = np.empty(0)
+        # Context table: sorted unique codes, their totals and pair ranges
+        self.contexts = np.empty(0, dtype=np.int64)
+        self.context_counts = np.empty(0)
+        self._context_ptr = np.zeros(1, dtype=np.int64)
+        self._tail = np.empty(0, dtype=np.int64)
+        self._expanded = None
+
+    @property
+    def transition_matrix(self):
+        """First-order (backoff) matrix, for code that needs a plain chain."""
+        return self.backoff.transition_matrix
+
+    def train(self, historical_data):
+        """Builds the tables from move logs, replacing any earlier training."""
+        self._reset()
+        self.backoff.train([])
+        self.partial_fit(historical_data)
+
+    def partial_fit(self, movements, continues=True):
+        """
+        Adds a batch of movements. All (k + 1)-room windows are cut at once
+        with a sliding window view; windows touching a -1 (break between
+        walks) are skipped. With continues, the last k rooms of the previous
+        batch lead into this one.
+        """
+        movements = np.asarray(movements, dtype=np.int64)
+        self.backoff.partial_fit(movements, continues)
+        # The expanded chain embeds the backoff rows, which just changed
+        self._expanded = None
+        if continues and len(self._tail):
+            movements = np.concatenate((self._tail, movements))
+        self._tail = movements[-self.order:].copy()
+        if len(movements) <= self.order:
+            return
+
+        windows = sliding_window_view(movements, self.order + 1)
+        windows = windows[(windows >= 0).all(axis=1)]
+        self._merge(windows[:, :-1] @ self._powers, windows[:, -1], np.ones(len(windows)))
+
+    def _merge(self, contexts, following, counts):
+        """
+        Folds new (context, next, count) triples into the sorted tables.
+        Only the batch is sorted; it is then matched against the table with
+        one binary search per distinct pair, and unseen pairs are inserted
+        in a single pass, O(batch * log(batch) + table).
+        """
+        order = np.lexsort((following, contexts))
+        contexts, following, counts = contexts[order], following[order], counts[order]
+        new_pair = np.ones(len(contexts), dtype=bool)
+        new_pair[1:] = (contexts[1:] != contexts[:-1]) | (following[1:] != following[:-1])
+        starts = np.flatnonzero(new_pair)
+        if len(starts) == 0:
+            return
+        contexts, following, counts = contexts[starts], following[starts], np.add.reduceat(counts, starts)
+
+        # Both sides get the same sort key without packing a context code
+        # and a room into one int64: stored context i ranks 2i + 1, and a
+        # new context ranks 2j, j being where it would be inserted
+        owners = np.repeat(np.arange(len(self.contexts)), np.diff(self._context_ptr))
+        table_keys = (2 * owners + 1) * self.n + self.pair_next
+        slots = np.searchsorted(self.contexts, contexts)
+        stored = self._lookup(contexts) >= 0
+        batch_keys = (2 * slots + stored) * self.n + following
+
+        pos = np.searchsorted(table_keys, batch_keys)
+        seen = pos < len(table_keys)
+        seen[seen] = table_keys[pos[seen]] == batch_keys[seen]
+        self.pair_counts[pos[seen]] += counts[seen]
+        unseen = ~seen
+        self.pair_contexts = np.insert(self.pair_contexts, pos[unseen], contexts[unseen])
+        self.pair_next = np.insert(self.pair_next, pos[unseen], following[unseen])
+        self.pair_counts = np.insert(self.pair_counts, pos[unseen], counts[unseen])
+        self._rebuild_contexts()
+        if len(self.contexts) > self.max_contexts:
+            keep = np.zeros(len(self.contexts), dtype=bool)
+            keep[np.argpartition(self.context_counts, -self.max_contexts)[-self.max_contexts:]] = True
+            self._keep_contexts(keep)
+
+    def _rebuild_contexts(self):
+        new_context = np.ones(len(self.pair_contexts), dtype=bool)
+        new_context[1:] = self.pair_contexts[1:] != self.pair_contexts[:-1]
+        starts = np.flatnonzero(new_context)
+        self.contexts = self.pair_contexts[starts]
+        self.context_counts = np.add.reduceat(self.pair_counts, starts) if len(starts) else np.empty(0)
+        self._context_ptr = np.append(starts, len(self.pair_contexts)).astype(np.int64)
+        self._expanded = None
+
+    def _keep_contexts(self, keep):
+        pairs = np.repeat(keep, np.diff(self._context_ptr))
+        self.pair_contexts = self.pair_contexts[pairs]
+        self.pair_next = self.pair_next[pairs]
+        self.pair_counts = self.pair_counts[pairs]
+        self._rebuild_contexts()
+
+    def prune(self, min_count):
+        """Drops contexts seen fewer than min_count times; they back off to first order."""
+        self._keep_contexts(self.context_counts >= min_count)
+
+    def _lookup(self, codes):
+        """Table index of each context code, or -1 if it is not stored."""
+        pos = np.searchsorted(self.contexts, codes)
+        found = pos < len(self.contexts)
+        found[found] = self.contexts[pos[found]] == codes[found]
+        return np.where(found, pos, -1)
+
+    def _start_weights(self, start_state):
+        """
+        Distribution over the expanded states (stored contexts, then one
+        first-order state per room) for a start given as a room index or a
+        sequence of recent rooms, most recent last. Contexts agreeing with
+        the known history are weighted by how often they were seen. A float
+        distribution over rooms spreads each room's mass over the contexts
+        ending there the same way.
+        """
+        if is_distribution(start_state):
+            return self._spread(start_state)
+        history = np.atleast_1d(np.asarray(start_state, dtype=np.int64))[-self.order:]
+        weights = np.zeros(len(self.contexts) + self.n)
+        suffix = history @ self._powers[-len(history):]
+        matches = self.contexts % (self.n ** len(history)) == suffix
+        if matches.any():
+            weights[:len(self.contexts)][matches] = self.context_counts[matches] / self.context_counts[matches].sum()
+        else:
+            weights[len(self.contexts) + history[-1]] = 1
+        return weights
+
+    def _spread(self, dist):
+        n_contexts = len(self.contexts)
+        last = self.contexts % self.n
+        totals = np.bincount(last, weights=self.context_counts, minlength=self.n)
+        weights = np.zeros(n_contexts + self.n)
+        weights[:n_contexts] = dist[last] * self.context_counts / np.where(totals == 0, 1, totals)[last]
+        # Rooms no stored context ends in start from their first-order state
+        weights[n_contexts:] = np.where(totals == 0, dist, 0)
+        return weights
+
+    def _expanded_transposed(self):
+        """
+        Transposed transition matrix over the context-expanded state space,
+        built on first use. A stored context (r1..rk) moving to x lands on
+        context (r2..rk, x) if that is stored, else on the first-order state
+        x; first-order states follow the backoff chain (and re-enter a
+        context directly when k <= 2 makes it fully known; at higher orders
+        they stay first-order, see the class docstring).
+        """
+        if self._expanded is not None:
+            return self._expanded
+
+        n_contexts = len(self.contexts)
+        owners = np.repeat(np.arange(n_contexts), np.diff(self._context_ptr))
+        shifted = (self.pair_contexts % (self.n ** (self.order - 1))) * self.n + self.pair_next
+        targets = self._lookup(shifted)
+        targets = np.where(targets >= 0, targets, n_contexts + self.pair_next)
+        probs = self.pair_counts / self.context_counts[owners]
+
+        backoff = sparse.coo_matrix(self.backoff.transition_matrix)
+        b_targets = n_contexts + backoff.col
+        if self.order <= 2:
+            codes = backoff.col if self.order == 1 else backoff.row.astype(np.int64) * self.n + backoff.col
+            found = self._lookup(codes.astype(np.int64))
+            b_targets = np.where(found >= 0, found, b_targets)
+
+        size = n_contexts + self.n
+        rows = np.concatenate((owners, n_contexts + backoff.row))
+        cols = np.concatenate((targets, b_targets))
+        data = np.concatenate((probs, backoff.data))
+        self._expanded = sparse.csr_matrix((data, (cols, rows)), shape=(size, size))
+        return self._expanded
+
+    def _collapse(self, weights):
+        """Room distribution from expanded-state weights (each state's last room)."""
+        rooms = np.concatenate((self.contexts % self.n, np.arange(self.n)))
+        return np.bincount(rooms, weights=weights, minlength=self.n)
+
+    def predict_k_steps(self, start_state, k):
+        """
+        Calculates the probability distribution after k steps, starting from
+        a room index, a sequence of recent room indices (most recent last) or
+        a float distribution over rooms.
+
+        A single step reads the context rows directly; longer horizons
+        propagate through the context-expanded chain, O(k * nnz).
+        """
+        weights = self._start_weights(start_state)
+        if k == 0:
+            return self._collapse(weights)
+        if k == 1:
+            n_contexts = len(self.contexts)
+            owners = np.repeat(np.arange(n_contexts), np.diff(self._context_ptr))
+            pair_weights = weights[owners] * self.pair_counts / self.context_counts[owners]
+            dist = np.bincount(self.pair_next, weights=pair_weights, minlength=self.n)
+            return dist + self.backoff.transition_matrix.T @ weights[n_contexts:]
+
+        transposed = self._expanded_transposed()
+        for _ in range(k):
+            weights = transposed @ weights
+        return self._collapse(weights)
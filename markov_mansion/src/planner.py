@@ -0,0 +1,199 @@
+import itertools
+from math import comb
+
+import numpy as np
+from scipy import sparse
+
+from src.game_logic import Mansion
+from src.model import is_distribution
+
+
+class TrapPlanner:
+    """
+    Chooses where to place a limited number of persistent traps so the
+    ghost is caught within a horizon with the highest probability.
+
+    Traps are placed now and stay put; the ghost is caught the first time
+    it moves into a trapped room (trapped rooms are absorbing). For a trap
+    set S the capture probability from every room is found by backward
+    induction:
+        V_H = 0,   V_t = P (1_S + (1 - 1_S) * V_{t+1}),
+    and from a start distribution b it is b . V_0. Many trap sets are
+    evaluated at once by stacking their masks as columns, so one sparse
+    matrix product per turn serves the whole batch.
+
+    Only rooms the ghost can reach within the horizon matter, so both the
+    chain and the candidate traps are restricted to them; candidates are
+    further pruned to the rooms with the most expected visits. The capture
+    probability is monotone submodular in S (it is the probability of
+    hitting any room of S), so greedy search is within 1 - 1/e of optimal;
+    beam and exhaustive search are available for small budgets.
+    """
+
+    def __init__(self, mansion: Mansion, model, horizon=5, budget=3, max_candidates=64,
+                 exhaustive_limit=5000):
+        """
+        Args:
+            mansion: The floor plan (for room names).
+            model: A trained MarkovPredictor (anything with transition_matrix).
+            horizon: Number of ghost moves the traps stay armed for.
+            budget: Number of traps available.
+            max_candidates: Rooms considered for traps, by expected visits.
+            exhaustive_limit: 'auto' searches exhaustively when the number
+                of trap sets is at most this, greedily otherwise.
+        """
+        self.mansion = mansion
+        self.model = model
+        self.horizon = horizon
+        self.budget = budget
+        self.max_candidates = max_candidates
+        self.exhaustive_limit = exhaustive_limit
+
+    def _start(self, start):
+        if is_distribution(start):
+            return np.asarray(start, dtype=float)
+        dist = np.zeros(self.model.n)
+        dist[self.mansion.room_to_idx[start] if isinstance(start, str) else int(start)] = 1
+        return dist
+
+    def _reachable(self, dist):
+        """Rooms reachable within the horizon and their expected visits."""
+        transposed = sparse.csr_matrix(self.model.transition_matrix).T.tocsr()
+        visits = np.zeros(self.model.n)
+        reached = dist > 0
+        for _ in range(self.horizon):
+            dist = transposed @ dist
+            visits += dist
+            reached |= dist > 0
+        return np.flatnonzero(reached), visits
+
+    def capture_values(self, traps):
+        """
+        Backward induction for one trap set: (horizon + 1) x rooms array whose
+        row t is the probability of capture by the horizon for a ghost in
+        each room at turn t.
+        """
+        matrix = sparse.csr_matrix(self.model.transition_matrix)
+        mask = np.zeros(self.model.n)
+        mask[list(traps)] = 1
+        values = np.zeros((self.horizon + 1, self.model.n))
+        for t in range(self.horizon - 1, -1, -1):
+            values[t] = matrix @ (mask + (1 - mask) * values[t + 1])
+        return values
+
+    def _evaluate(self, matrix, start, trap_sets):
+        """Capture probability of each trap set (sequences of local indices)."""
+        sizes = [len(traps) for traps in trap_sets]
+        rooms = np.fromiter(itertools.chain.from_iterable(trap_sets), dtype=np.int64, count=sum(sizes))
+        masks = np.zeros((matrix.shape[0], len(trap_sets)))
+        masks[rooms, np.repeat(np.arange(len(trap_sets)), sizes)] = 1
+        values = np.zeros_like(masks)
+        for _ in range(self.horizon):
+            values = matrix @ (masks + (1 - masks) * values)
+        return start @ values
+
+    def evaluate(self, start, trap_sets):
+        """Capture probabilities for many trap sets (lists of rooms) at once."""
+        dist = self._start(start)
+        trap_sets = [[self.mansion.room_to_idx[r] if isinstance(r, str) else int(r) for r in traps]
+                     for traps in trap_sets]
+        matrix = sparse.csr_matrix(self.model.transition_matrix)
+        return self._evaluate(matrix, dist, trap_sets)
+
+    def plan(self, start, budget=None, method="auto", beam_width=8):
+        """
+        Best trap placement from a start room, room index or belief.
+
+        method: 'greedy' (lazy greedy), 'beam', 'exhaustive' or 'auto'.
+
+        Returns a dict with 'traps' (room names), 'room_indices',
+        'capture_probability', 'method' and 'evaluated' (trap sets scored).
+        """
+        budget = self.budget if budget is None else budget
+        dist = self._start(start)
+        reach, visits = self._reachable(dist)
+        # Chain restricted to the reachable rooms (local indices)
+        matrix = sparse.csr_matrix(self.model.transition_matrix)[reach][:, reach]
+        local_start = dist[reach]
+        order = np.argsort(-visits[reach], kind="stable")
+        candidates = order[visits[reach][order] > 0][:self.max_candidates]
+        budget = min(budget, len(candidates))
+
+        if method == "auto":
+            method = "exhaustive" if comb(len(candidates), budget) <= self.exhaustive_limit else "greedy"
+        if budget == 0:
+            chosen, value, evaluated = [], 0.0, 0
+        elif method == "exhaustive":
+            chosen, value, evaluated = self._exhaustive(matrix, local_start, candidates, budget)
+        elif method == "beam":
+            chosen, value, evaluated = self._beam(matrix, local_start, candidates, budget, beam_width)
+        elif method == "greedy":
+            chosen, value, evaluated = self._greedy(matrix, local_start, candidates, budget)
+        else:
+            raise ValueError(f"Unknown method: {method}")
+
+        indices = reach[np.asarray(chosen, dtype=np.int64)]
+        return {
+            "traps": [self.mansion.idx_to_room[i] for i in indices],
+            "room_indices": indices,
+            "capture_probability": float(value),
+            "method": method,
+            "evaluated": evaluated,
+        }
+
+    def _exhaustive(self, matrix, start, candidates, budget, chunk=1024):
+        best, best_value, evaluated = [], -1.0, 0
+        combos = itertools.combinations(candidates, budget)
+        while True:
+            block = list(itertools.islice(combos, chunk))
+            if not block:
+                return best, best_value, evaluated
+            scores = self._evaluate(matrix, start, block)
+            evaluated += len(block)
+            i = int(np.argmax(scores))
+            if scores[i] > best_value:
+                best, best_value = list(block[i]), scores[i]
+
+    def _beam(self, matrix, start, candidates, budget, beam_width):
+        beam, evaluated = [((), 0.0)], 0
+        for _ in range(budget):
+            expansions = sorted({tuple(sorted(traps + (c,))) for traps, _ in beam for c in candidates if c not in traps})
+            scores = self._evaluate(matrix, start, expansions)
+            evaluated += len(expansions)
+            top = np.argsort(-scores, kind="stable")[:beam_width]
+            beam = [(expansions[i], scores[i]) for i in top]
+        return list(beam[0][0]), beam[0][1], evaluated
+
+    def _greedy(self, matrix, start, candidates, budget, batch=8):
+        """
+        Lazy greedy: stale gains are upper bounds on fresh ones
+        (submodularity), so each round re-scores candidates in batches, best
+        bound first, until the best fresh gain beats every remaining bound.
+        """
+        chosen, value = [], 0.0
+        bounds = np.full(len(candidates), np.inf)
+        available = np.ones(len(candidates), dtype=bool)
+        evaluated = 0
+        for _ in range(budget):
+            fresh = np.full(len(candidates), -np.inf)
+            while True:
+                pending = np.flatnonzero(available & np.isneginf(fresh))
+                unbounded = pending[np.isinf(bounds[pending])]
+                # The first round has no bounds yet: score everything in one batch
+                if len(unbounded):
+                    pending = unbounded
+                else:
+                    pending = pending[np.argsort(-bounds[pending], kind="stable")][:batch]
+                if len(pending):
+                    scores = self._evaluate(matrix, start, [chosen + [candidates[i]] for i in pending])
+                    evaluated += len(pending)
+                    fresh[pending] = scores - value
+                    bounds[pending] = fresh[pending]
+                best = int(np.argmax(np.where(available, fresh, -np.inf)))
+                remaining = available & np.isneginf(fresh)
+                if not remaining.any() or fresh[best] >= bounds[remaining].max():
+                    break
+            chosen.append(candidates[best])
+            value += fresh[best]
+            available[best] = False
+        return chosen, value, evaluated
@@ -0,0 +1,108 @@
+import numpy as np
+from scipy import sparse
+
+from src.game_logic import Mansion
+
+
+class GhostSimulator:
+    """
+    Moves many ghosts at once through a mansion compiled to CSR arrays.
+
+    Row r of the compiled graph lists the rooms reachable from room r
+    (indices[indptr[r]:indptr[r + 1]]) and a global cumulative array whose
+    entries for that row run from r (exclusive) up to exactly r + 1, so a
+    single searchsorted of position + u, with u ~ U[0, 1), samples the next
+    room for every ghost in one NumPy call. Rooms without exits keep the
+    ghost in place.
+    """
+
+    def __init__(self, mansion: Mansion, transition_matrix=None, seed=None):
+        """
+        Args:
+            mansion: The floor plan; by default every neighbor is equally likely.
+            transition_matrix: Optional (rooms x rooms) dense or sparse matrix
+                of non-uniform move probabilities (e.g. model.transition_matrix).
+                Rows are renormalized; an all-zero row becomes a self-loop.
+            seed: Seed (or SeedSequence / Generator) for reproducible walks.
+        """
+        self.mansion = mansion
+        self.n = mansion.n_rooms
+        self.rng = np.random.default_rng(seed)
+
+        if transition_matrix is None:
+            indptr, indices = mansion.indptr, mansion.indices
+            weights = np.ones(len(indices))
+        else:
+            matrix = sparse.csr_matrix(transition_matrix, dtype=float)
+            if matrix.shape != (self.n, self.n):
+                raise ValueError(
+                    f"transition_matrix has shape {matrix.shape}, expected {(self.n, self.n)} for this mansion"
+                )
+            matrix.eliminate_zeros()
+            indptr, indices, weights = matrix.indptr, matrix.indices, matrix.data
+
+        # Dead ends (no exits or no probability mass) become self-loops
+        degree = np.diff(indptr)
+        dead = np.flatnonzero(degree == 0)
+        if len(dead):
+            indices = np.insert(indices, indptr[dead], dead)
+            weights = np.insert(weights, indptr[dead], 1.0)
+            degree[dead] = 1
+            indptr = np.concatenate(([0], np.cumsum(degree)))
+
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        rows = np.repeat(np.arange(self.n), np.diff(self.indptr))
+        row_totals = np.bincount(rows, weights=weights, minlength=self.n)
+        self.probabilities = weights / row_totals[rows]
+
+        # Within-row cumulative sums, offset by the row index
+        cumulative = np.cumsum(self.probabilities)
+        row_start = np.concatenate(([0.0], cumulative))[self.indptr[:-1]]
+        self._cumulative = cumulative - row_start[rows] + rows
+        self._cumulative[self.indptr[1:] - 1] = np.arange(1, self.n + 1)
+
+    def _start_positions(self, n_ghosts, start):
+        if start is None:
+            return self.rng.integers(0, self.n, n_ghosts)
+        if isinstance(start, str):
+            start = self.mansion.room_to_idx[start]
+        return np.broadcast_to(np.asarray(start, dtype=np.int64), (n_ghosts,)).copy()
+
+    def step(self, positions: np.ndarray) -> np.ndarray:
+        """Moves every ghost one room; positions are room indices."""
+        u = self.rng.random(len(positions))
+        slot = np.searchsorted(self._cumulative, positions + u, side="right")
+        # r + u can round up to r + 1 for large r; stay inside the row
+        slot = np.minimum(slot, self.indptr[positions + 1] - 1)
+        return self.indices[slot]
+
+    def iter_walks(self, n_ghosts: int, n_steps: int, start=None, chunk_steps: int = 1024):
+        """
+        Yields the walk in blocks of up to chunk_steps rows of shape
+        (steps, n_ghosts), so 10^8-step datasets never sit in memory at
+        once. The first block starts with the starting positions.
+        """
+        positions = self._start_positions(n_ghosts, start)
+        block = [positions]
+        for _ in range(n_steps):
+            positions = self.step(positions)
+            block.append(positions)
+            if len(block) == chunk_steps:
+                yield np.stack(block)
+                block = []
+        if block:
+            yield np.stack(block)
+
+    def walk(self, n_ghosts: int, n_steps: int, start=None) -> np.ndarray:
+        """(n_steps + 1) x n_ghosts array of room indices, starting positions first."""
+        return np.concatenate(list(self.iter_walks(n_ghosts, n_steps, start)))
+
+    def movements(self, n_ghosts: int, n_steps: int, start=None) -> np.ndarray:
+        """
+        The walks flattened ghost by ghost into one movement log, with -1
+        between ghosts, ready for MarkovPredictor.train / partial_fit.
+        """
+        walks = self.walk(n_ghosts, n_steps, start).T
+        separated = np.hstack((walks, np.full((n_ghosts, 1), -1, dtype=walks.dtype)))
+        return separated.ravel()[:-1]
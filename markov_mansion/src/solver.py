@@ -1,7 +1,18 @@
 import numpy as np
-from src.model import MarkovPredictor
+from src.model import MarkovPredictor, is_distribution
 from src.game_logic import Mansion
 
+def top_n_indices(probabilities: np.ndarray, top_n: int) -> np.ndarray:
+    """
+    Indices of the top_n largest entries along the last axis, most likely
+    first. argpartition selects them in O(n); only those top_n get sorted.
+    """
+    top_n = min(top_n, probabilities.shape[-1])
+    candidates = np.argpartition(probabilities, -top_n, axis=-1)[..., -top_n:]
+    values = np.take_along_axis(probabilities, candidates, axis=-1)
+    order = np.argsort(-values, axis=-1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=-1)
+
 class DetectiveSolver:
     def __init__(self, mansion: Mansion, model: MarkovPredictor):
         self.mansion = mansion
@@ -16,25 +27,112 @@ class DetectiveSolver:
         p = probabilities[probabilities > 0]
         return -np.sum(p * np.log2(p))
 
-    def recommend_traps(self, current_room: str, k_steps: int, top_n: int = 3):
+    def recommend_traps(self, current_room, k_steps: int, top_n: int = 3):
         """
         Predicts where the ghost will be in k steps and returns top candidates.
+
+        current_room may also be a list of recently seen rooms (most recent
+        last), which a higher-order model such as NGramPredictor uses, or a
+        belief distribution over rooms (e.g. GhostTracker.belief) when the
+        ghost's position is uncertain.
         """
-        start_idx = self.mansion.room_to_idx[current_room]
+        if is_distribution(current_room):
+            start_idx = current_room
+        elif isinstance(current_room, str):
+            start_idx = self.mansion.room_to_idx[current_room]
+        else:
+            start_idx = [self.mansion.room_to_idx[room] for room in current_room]
         
         # Calculate the probability vector for k steps ahead
         probs = self.model.predict_k_steps(start_idx, k_steps)
         entropy = self.calculate_entropy(probs)
         
-        # Sort rooms by probability
-        ranked_indices = np.argsort(probs)[::-1]
+        # Rank only the top candidates instead of sorting every room
+        ranked_indices = top_n_indices(probs, top_n)
         
         recommendations = []
-        for i in range(top_n):
-            idx = ranked_indices[i]
+        for idx in ranked_indices:
             recommendations.append({
                 "room": self.mansion.idx_to_room[idx],
                 "probability": round(probs[idx] * 100, 2)
             })
             
-        return recommendations, entropy
\ No newline at end of file
+        return recommendations, entropy
+
+    def recommend_traps_batch(self, horizons=range(1, 11), top_n: int = 3, rooms=None,
+                              chunk_bytes: int = 64 * 2**20):
+        """
+        Trap recommendations for every starting room and horizon at once.
+
+        The k-step distributions of the starting rooms are advanced together
+        as a block of one-hot rows through model.predict_k_steps, so each
+        requested horizon continues from the previous one and the model's
+        power cache and stationary shortcut apply. Starting rooms are taken
+        a block at a time, as many rows as fit in chunk_bytes (8 bytes per
+        room per row); the block, the propagated copy and one scratch
+        buffer for the entropy are the only arrays of that size.
+        Only first-order models qualify: a higher-order model's prediction
+        depends on more than the current room distribution, so use
+        recommend_traps for those.
+
+        Args:
+            horizons: Step counts to report, e.g. range(1, 11).
+            top_n: Number of ranked rooms per (room, horizon).
+            rooms: Starting room names; defaults to every room.
+            chunk_bytes: Memory budget of one block of distributions.
+
+        Returns:
+            dict with 'start_rooms' and 'horizons' (the table axes),
+            'room_indices' and 'rooms' (rooms x horizons x top_n, most likely
+            first), 'probabilities' (same shape, as fractions, not percent)
+            and 'entropy' (rooms x horizons).
+        """
+        if not isinstance(self.model, MarkovPredictor):
+            raise TypeError(
+                f"recommend_traps_batch needs a first-order MarkovPredictor, not "
+                f"{type(self.model).__name__}; use recommend_traps for higher-order models"
+            )
+        start_rooms = list(self.mansion.rooms if rooms is None else rooms)
+        horizons = np.asarray(list(horizons), dtype=int)
+        if len(horizons) and horizons.min() < 0:
+            raise ValueError("Horizons must be non-negative")
+        starts = np.array([self.mansion.room_to_idx[room] for room in start_rooms], dtype=int)
+        top_n = min(top_n, self.model.n)
+
+        room_indices = np.zeros((len(starts), len(horizons), top_n), dtype=int)
+        probabilities = np.zeros((len(starts), len(horizons), top_n))
+        entropy = np.zeros((len(starts), len(horizons)))
+
+        chunk_rows = max(1, chunk_bytes // (8 * self.model.n))
+        scratch = np.empty((min(chunk_rows, len(starts)), self.model.n))
+        for first in range(0, len(starts), chunk_rows):
+            block = slice(first, first + chunk_rows)
+            chunk = starts[block]
+            dist = np.zeros((len(chunk), self.model.n))
+            dist[np.arange(len(chunk)), chunk] = 1
+            logs = scratch[:len(chunk)]
+            step = 0
+            for h_pos in np.argsort(horizons, kind="stable"):
+                if horizons[h_pos] > step:
+                    dist = self.model.predict_k_steps(dist, int(horizons[h_pos]) - step)
+                    step = horizons[h_pos]
+                ranked = top_n_indices(dist, top_n)
+                room_indices[block, h_pos] = ranked
+                probabilities[block, h_pos] = np.take_along_axis(dist, ranked, axis=-1)
+                # p * log2(p) in place in the scratch buffer, 0 where p = 0
+                logs.fill(0.0)
+                np.log2(dist, out=logs, where=dist > 0)
+                np.multiply(logs, dist, out=logs)
+                entropy[block, h_pos] = 0.0 - logs.sum(axis=-1)
+
+        # Name only the rooms that made it into the table
+        unique, inverse = np.unique(room_indices, return_inverse=True)
+        names = np.array([self.mansion.idx_to_room[i] for i in unique], dtype=object)
+        return {
+            "start_rooms": start_rooms,
+            "horizons": horizons,
+            "room_indices": room_indices,
+            "rooms": names[inverse].reshape(room_indices.shape),
+            "probabilities": probabilities,
+            "entropy": entropy,
+        }
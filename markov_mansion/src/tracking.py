@@ -0,0 +1,122 @@
+import numpy as np
+from scipy import sparse
+
+from src.game_logic import Mansion
+
+
+class SensorModel:
+    """
+    Noisy ghost sightings. When the ghost is in room r, the sensor:
+        - reports r with probability hit_rate[r],
+        - reports a uniformly random neighbor of r with probability confusion[r],
+        - reports a uniformly random room with probability false_alarm,
+        - reports nothing (a missing sighting) otherwise.
+    hit_rate and confusion may be scalars or per-room arrays.
+    """
+
+    def __init__(self, mansion: Mansion, hit_rate=0.8, confusion=0.1, false_alarm=0.01):
+        self.mansion = mansion
+        self.n = mansion.n_rooms
+        self.hit_rate = np.broadcast_to(np.asarray(hit_rate, dtype=float), (self.n,)).copy()
+        self.confusion = np.broadcast_to(np.asarray(confusion, dtype=float), (self.n,)).copy()
+        self.false_alarm = float(false_alarm)
+        self.silence = 1 - self.hit_rate - self.confusion - self.false_alarm
+        if (self.silence < -1e-12).any():
+            raise ValueError("hit_rate + confusion + false_alarm must not exceed 1 in any room")
+
+        degree = np.diff(mansion.indptr)
+        rows = np.repeat(np.arange(self.n), degree)
+        # Column o of the confusion matrix = P(report o | ghost in r) over r;
+        # stored transposed so each report reads one CSR row, O(degree)
+        weights = self.confusion[rows] / degree[rows]
+        self._confusion_t = sparse.csr_matrix((weights, (mansion.indices, rows)), shape=(self.n, self.n))
+        # A room without doors cannot be confused with a neighbor
+        self._lonely = degree == 0
+        with np.errstate(divide="ignore"):
+            self._log_silence = np.log(np.clip(self.silence, 0, None))
+
+    def _index(self, observation):
+        return self.mansion.room_to_idx[observation] if isinstance(observation, str) else int(observation)
+
+    def log_likelihood(self, observation):
+        """log P(observation | ghost in r) for every room r; None is a missing sighting."""
+        if observation is None:
+            return self._log_silence
+        o = self._index(observation)
+        likelihood = np.full(self.n, self.false_alarm / self.n)
+        likelihood[o] += self.hit_rate[o] + (self.confusion[o] if self._lonely[o] else 0.0)
+        start, stop = self._confusion_t.indptr[o], self._confusion_t.indptr[o + 1]
+        likelihood[self._confusion_t.indices[start:stop]] += self._confusion_t.data[start:stop]
+        with np.errstate(divide="ignore"):
+            return np.log(likelihood)
+
+    def sample(self, room, rng=None):
+        """A simulated sighting (room name, or None) for a ghost in room."""
+        rng = np.random.default_rng() if rng is None else rng
+        r = self._index(room)
+        u = rng.random()
+        if u < self.hit_rate[r]:
+            return self.mansion.idx_to_room[r]
+        u -= self.hit_rate[r]
+        if u < self.confusion[r]:
+            neighbors = self.mansion.neighbor_indices(r)
+            return self.mansion.idx_to_room[rng.choice(neighbors) if len(neighbors) else r]
+        u -= self.confusion[r]
+        if u < self.false_alarm:
+            return self.mansion.idx_to_room[rng.integers(self.n)]
+        return None
+
+
+class GhostTracker:
+    """
+    Hidden-Markov forward filter over the ghost's room.
+
+    The belief is kept as log-probabilities. Each turn costs one predict
+    (propagate through the transition matrix, O(nnz), shifted by the max
+    log-probability so exp never underflows) and one update (add the
+    sensor log-likelihood and renormalize with logsumexp); the hunt is
+    never replayed from the start.
+    """
+
+    def __init__(self, model, sensor: SensorModel, prior=None):
+        """
+        Args:
+            model: A trained MarkovPredictor (anything with transition_matrix).
+            sensor: The sensor likelihood model.
+            prior: Initial belief over rooms; uniform by default.
+        """
+        self.model = model
+        self.sensor = sensor
+        prior = np.full(model.n, 1 / model.n) if prior is None else np.asarray(prior, dtype=float)
+        with np.errstate(divide="ignore"):
+            self.log_belief = np.log(prior / prior.sum())
+        # log P(all sightings so far)
+        self.log_evidence = 0.0
+
+    @property
+    def belief(self):
+        """Current distribution over rooms."""
+        return np.exp(self.log_belief)
+
+    def predict(self):
+        """One ghost move: log b <- log(b P)."""
+        shift = self.log_belief.max()
+        moved = self.model.transition_matrix.T @ np.exp(self.log_belief - shift)
+        with np.errstate(divide="ignore"):
+            self.log_belief = np.log(moved) + shift
+        return self
+
+    def update(self, observation):
+        """Bayes update with one sighting (room name, index, or None if missing)."""
+        joint = self.log_belief + self.sensor.log_likelihood(observation)
+        shift = joint.max()
+        if not np.isfinite(shift):
+            raise ValueError(f"Sighting {observation!r} is impossible under the current belief")
+        log_total = shift + np.log(np.exp(joint - shift).sum())
+        self.log_belief = joint - log_total
+        self.log_evidence += log_total
+        return self
+
+    def step(self, observation):
+        """Advances one turn: the ghost moves, then the sensor reports."""
+        return self.predict().update(observation)
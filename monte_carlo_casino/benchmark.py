@@ -0,0 +1,161 @@
+"""
+Throughput and memory benchmarks for the casino engine.
+
+    python benchmark.py --output bench.json
+    python benchmark.py --output bench.json --compare baseline.json --threshold 0.15
+
+Every metric is recorded with the direction that counts as better, so the
+compare mode can fail (exit code 1) when any metric regresses by more
+than the threshold relative to the stored baseline, or when a baseline
+metric is no longer produced.
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+import numpy as np
+
+from main import run_simulation
+from src.engine import RouletteEngine
+from src.recorder import make_recorder
+from src.strategies import ConstantBet, Martingale, Fibonacci
+
+STRATEGIES = [ConstantBet, Martingale, Fibonacci]
+SIZES = [(100, 100), (1000, 200), (1000, 1000)]
+
+
+def _best_of(fn: Callable[[], None], repeat: int) -> float:
+    """Best wall-clock time of several calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_spin_throughput(n_spins: int, repeat: int) -> Dict[str, float]:
+    engine = RouletteEngine(initial_capital=float("inf"), rng=np.random.default_rng(0))
+
+    def scalar():
+        for _ in range(n_spins):
+            engine.spin(10, "color", "red")
+        engine.reset()
+
+    n_runs, batch_spins = 10000, 200
+    batch = lambda: engine.simulate_batch(n_runs, batch_spins, ConstantBet, seed=0)
+    return {
+        "spin.scalar.spins_per_sec": n_spins / _best_of(scalar, repeat),
+        "spin.batch.spins_per_sec": n_runs * batch_spins / _best_of(batch, repeat),
+    }
+
+
+def bench_history_memory(n_spins: int) -> Dict[str, float]:
+    """Bytes retained per run by each history mode after n_spins spins."""
+    results = {}
+    for mode in ("dicts", "full", "balance", "summary"):
+        # Traced from before construction, so preallocated recorder buffers count too
+        tracemalloc.start()
+        engine = RouletteEngine(initial_capital=float("inf"), recorder=make_recorder(mode, n_spins))
+        for _ in range(n_spins):
+            engine.spin(10, "color", "red")
+        history = engine.collect_history()
+        engine.reset()
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del history
+        results[f"memory.{mode}.bytes_per_run"] = retained
+    return results
+
+
+def bench_run_simulation(repeat: int) -> Dict[str, float]:
+    """
+    Both run_simulation paths: the default serial loop (no seed) and the
+    seeded per-run streams, which go through run_parallel_simulation.
+    """
+    results = {}
+    for strategy in STRATEGIES:
+        for n_runs, n_spins in SIZES:
+            for path, seed in (("serial", None), ("seeded", 0)):
+                run = lambda: run_simulation(strategy, n_runs, n_spins, seed=seed)
+                # run_simulation prints a banner per call; keep the report clean
+                with contextlib.redirect_stdout(io.StringIO()):
+                    seconds = _best_of(run, repeat)
+                results[f"run_simulation.{strategy.__name__}.{n_runs}x{n_spins}.{path}.seconds"] = seconds
+    return results
+
+
+def run_benchmarks(repeat: int = 3, quick: bool = False) -> Dict:
+    n_spins = 20000 if quick else 200000
+    metrics = {}
+    metrics.update(bench_spin_throughput(n_spins, repeat))
+    metrics.update(bench_history_memory(1000))
+    metrics.update(bench_run_simulation(1 if quick else repeat))
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "metrics": metrics,
+    }
+
+
+def higher_is_better(name: str) -> bool:
+    return name.endswith("per_sec")
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> bool:
+    """
+    Prints a per-metric diff and returns False if any metric regressed or
+    a baseline metric is missing from the current run.
+    """
+    ok = True
+    for name in sorted(set(baseline["metrics"]) - set(current["metrics"])):
+        print(f"  {'FAIL':5} {name}: missing from this run")
+        ok = False
+    for name, value in sorted(current["metrics"].items()):
+        if name not in baseline["metrics"]:
+            print(f"  NEW   {name}: {value:.4g}")
+            continue
+        base = baseline["metrics"][name]
+        if base == 0:
+            continue
+        # Positive change = worse, whichever direction the metric runs
+        change = (base - value) / base if higher_is_better(name) else (value - base) / base
+        regressed = change > threshold
+        ok &= not regressed
+        print(f"  {'FAIL' if regressed else 'ok':5} {name}: {base:.4g} -> {value:.4g} ({-change:+.1%})")
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="bench.json", help="where to write this run's results")
+    parser.add_argument("--compare", help="baseline JSON to gate against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative regression (default 0.10)")
+    parser.add_argument("--repeat", type=int, default=3, help="timing repeats; the best is kept")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes for a fast smoke run")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.repeat, args.quick)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {len(results['metrics'])} metrics to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"Comparing against {args.compare} (threshold {args.threshold:.0%}):")
+        if not compare(results, baseline, args.threshold):
+            print("Regression detected.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,34 +1,58 @@
 from src.engine import RouletteEngine
 from src.strategies import ConstantBet, Martingale, Fibonacci
+from src.parallel import PROGRESS_REPORTS, report_progress, run_parallel_simulation
+from src.recorder import make_recorder
+from src.sequential import run_to_precision
+from src.stats import StreamingStats
+from src.variance import compare_strategies
 from src.visualizer import AnalyticsVisualizer
 import pandas as pd
 
-def run_simulation(strategy_class, num_runs=100, spins_per_run=100):
+def run_simulation(strategy_class, num_runs=100, spins_per_run=100, seed=None, n_workers=1,
+                   history_mode="dicts", stats=None):
     """
     Executes multiple simulation loops for a given strategy.
+
+    Passing a seed (or more than one worker) makes the campaign replayable:
+    every run draws from its own stream spawned from the master seed, so the
+    results are identical whatever the worker count.
+
+    history_mode chooses what is kept per run: 'dicts' (the original
+    list of spin dicts), 'full' or 'balance' (columnar arrays) or
+    'summary' (final balance, peak, trough and ruin spin only).
+
+    An optional StreamingStats accumulator is fed as each run finishes,
+    with a progress line printed a few times along the way on either path.
     """
-    engine = RouletteEngine(type="European", initial_capital=1000)
+    if seed is not None or n_workers != 1:
+        return run_parallel_simulation(
+            strategy_class, num_runs, spins_per_run, seed=seed, n_workers=n_workers,
+            history_mode=history_mode, stats=stats,
+        )
+
+    engine = RouletteEngine(
+        type="European",
+        initial_capital=1000,
+        recorder=make_recorder(history_mode, spins_per_run),
+    )
     all_histories = []
     final_balances = []
 
     print(f"--- Running {num_runs} simulations for {strategy_class.__name__} ---")
+    # Same cadence as the single-worker parallel path: one line per block of runs
+    report_every = -(-num_runs // PROGRESS_REPORTS)
 
-    for _ in range(num_runs):
+    for run_index in range(num_runs):
         engine.reset()
         strategy = strategy_class(initial_bet=10)
-        
-        # Initial spin to kick off the strategy state
-        current_bet = strategy.initial_bet
-        
-        for _ in range(spins_per_run):
-            if engine.current_balance < current_bet:
-                break # Player is "Ruined"
-                
-            result = engine.spin(current_bet, bet_type="color", bet_value="red")
-            current_bet = strategy.update(result)
-            
-        all_histories.append(engine.history)
+        ruin_spin = engine.play(strategy, spins_per_run)
+
+        all_histories.append(engine.collect_history())
         final_balances.append(engine.current_balance)
+        if stats is not None:
+            stats.add(engine.current_balance, ruin_spin)
+            if (run_index + 1) % report_every == 0 or run_index + 1 == num_runs:
+                report_progress(stats)
 
     return all_histories, final_balances
 
@@ -39,22 +63,30 @@ def main():
     spins = 200
     
     # 1. Test Martingale (High Volatility)
-    m_history, m_finals = run_simulation(Martingale, num_sims, spins)
+    m_stats = StreamingStats(spins)
+    m_history, m_finals = run_simulation(Martingale, num_sims, spins, stats=m_stats)
     viz.plot_wealth_trajectories(m_history, "Martingale")
     
     # 2. Test Constant Bet (Control Group)
-    c_history, c_finals = run_simulation(ConstantBet, num_sims, spins)
+    c_stats = StreamingStats(spins)
+    c_history, c_finals = run_simulation(ConstantBet, num_sims, spins, stats=c_stats)
     viz.plot_wealth_trajectories(c_history, "Constant Bet")
 
     # Summary Statistics Comparison
-    stats = {
-        "Strategy": ["Martingale", "Constant Bet"],
-        "Avg Final Balance": [sum(m_finals)/num_sims, sum(c_finals)/num_sims],
-        "Max Final": [max(m_finals), max(c_finals)],
-        "Min Final": [min(m_finals), min(c_finals)]
-    }
+    stats = pd.DataFrame([m_stats.summary(), c_stats.summary()])
+    stats.insert(0, "Strategy", ["Martingale", "Constant Bet"])
     print("\nSimulation Summary:")
-    print(pd.DataFrame(stats))
+    print(stats)
+
+    # Paired comparison: both strategies face the same spins
+    print("\nCommon Random Numbers Comparison:")
+    print(compare_strategies([ConstantBet, Martingale], n_runs=10000, n_spins=spins, antithetic=True))
+
+    # Run only as many lives as it takes to pin down Martingale's ruin risk
+    print("\nMartingale Ruin Probability (target +/- 1%):")
+    ruin = run_to_precision(Martingale, 0.01, metric="ruin", spins_per_run=spins)
+    low, high = ruin.interval
+    print(f"{100 * ruin.estimate:.2f}% [{100 * low:.2f}, {100 * high:.2f}] after {ruin.n_runs} runs")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,148 @@
+from dataclasses import dataclass
+from typing import Iterable, Sequence, Tuple
+
+import numpy as np
+
+# Standard Red/Black distribution (identical on both wheel types)
+RED_POCKETS = frozenset({1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36})
+BLACK_POCKETS = frozenset(range(1, 37)) - RED_POCKETS
+
+# The American "00" pocket is stored as index 37 in integer pocket arrays
+DOUBLE_ZERO_INDEX = 37
+
+
+@dataclass(frozen=True)
+class Bet:
+    """
+    A single wager on the table: the pocket indices it covers, its payout
+    ratio (35 for 35:1) and its stake relative to the rest of the layout.
+    """
+    name: str
+    numbers: Tuple[int, ...]
+    payout: int
+    stake: float = 1.0
+
+    def scaled(self, stake: float) -> "Bet":
+        return Bet(self.name, self.numbers, self.payout, stake)
+
+
+def _pocket_index(number) -> int:
+    return DOUBLE_ZERO_INDEX if number == "00" else int(number)
+
+
+def straight(number, stake: float = 1.0) -> Bet:
+    return Bet(f"straight {number}", (_pocket_index(number),), 35, stake)
+
+
+def split(a: int, b: int, stake: float = 1.0) -> Bet:
+    a, b = sorted((a, b))
+    side_by_side = b - a == 1 and a % 3 != 0
+    if a < 1 or b > 36 or not (side_by_side or b - a == 3):
+        raise ValueError(f"{a} and {b} are not adjacent on the layout")
+    return Bet(f"split {a}/{b}", (a, b), 17, stake)
+
+
+def street(row: int, stake: float = 1.0) -> Bet:
+    """Row 1 is 1-2-3, row 12 is 34-35-36."""
+    if not 1 <= row <= 12:
+        raise ValueError("Street row must be between 1 and 12")
+    first = 3 * row - 2
+    return Bet(f"street {first}-{first + 2}", (first, first + 1, first + 2), 11, stake)
+
+
+def corner(top_left: int, stake: float = 1.0) -> Bet:
+    """The four numbers sharing a corner, named by the lowest of them."""
+    if not 1 <= top_left <= 32 or top_left % 3 == 0:
+        raise ValueError(f"No corner starts at {top_left}")
+    numbers = (top_left, top_left + 1, top_left + 3, top_left + 4)
+    return Bet(f"corner {top_left}", numbers, 8, stake)
+
+
+def six_line(row: int, stake: float = 1.0) -> Bet:
+    """Two adjacent streets; row 1 covers 1-6, row 11 covers 31-36."""
+    if not 1 <= row <= 11:
+        raise ValueError("Six-line row must be between 1 and 11")
+    first = 3 * row - 2
+    return Bet(f"six line {first}-{first + 5}", tuple(range(first, first + 6)), 5, stake)
+
+
+def dozen(which: int, stake: float = 1.0) -> Bet:
+    if which not in (1, 2, 3):
+        raise ValueError("Dozen must be 1, 2 or 3")
+    first = 12 * (which - 1) + 1
+    return Bet(f"dozen {which}", tuple(range(first, first + 12)), 2, stake)
+
+
+def column(which: int, stake: float = 1.0) -> Bet:
+    if which not in (1, 2, 3):
+        raise ValueError("Column must be 1, 2 or 3")
+    return Bet(f"column {which}", tuple(range(which, 37, 3)), 2, stake)
+
+
+def color(value: str, stake: float = 1.0) -> Bet:
+    pockets = {"red": RED_POCKETS, "black": BLACK_POCKETS}
+    if value not in pockets:
+        raise ValueError(f"Unsupported color: {value}")
+    return Bet(value, tuple(sorted(pockets[value])), 1, stake)
+
+
+def odd(stake: float = 1.0) -> Bet:
+    return Bet("odd", tuple(range(1, 37, 2)), 1, stake)
+
+
+def even(stake: float = 1.0) -> Bet:
+    return Bet("even", tuple(range(2, 37, 2)), 1, stake)
+
+
+def low(stake: float = 1.0) -> Bet:
+    return Bet("low 1-18", tuple(range(1, 19)), 1, stake)
+
+
+def high(stake: float = 1.0) -> Bet:
+    return Bet("high 19-36", tuple(range(19, 37)), 1, stake)
+
+
+def payout_matrix(n_pockets: int, bets: Sequence[Bet]) -> np.ndarray:
+    """
+    (pocket x bet) matrix of net return per unit staked: the payout ratio
+    where the bet covers the pocket, -1 everywhere else.
+    """
+    matrix = np.full((n_pockets, len(bets)), -1.0)
+    for j, bet in enumerate(bets):
+        covered = [n for n in bet.numbers if n < n_pockets]
+        if len(covered) != len(bet.numbers):
+            raise ValueError(f"{bet.name} covers a pocket this wheel does not have")
+        matrix[covered, j] = bet.payout
+    return matrix
+
+
+@dataclass(frozen=True)
+class BetLayout:
+    """
+    Several simultaneous bets placed on one spin.
+
+    Stakes are relative: when the layout is played with a bet amount, that
+    amount is the total on the table, split across bets in proportion to
+    their stakes.
+    """
+    bets: Tuple[Bet, ...]
+
+    def __init__(self, bets: Iterable[Bet]):
+        object.__setattr__(self, "bets", tuple(bets))
+        if not self.bets:
+            raise ValueError("A layout needs at least one bet")
+
+    @property
+    def stakes(self) -> np.ndarray:
+        return np.array([bet.stake for bet in self.bets], dtype=float)
+
+    @property
+    def total_stake(self) -> float:
+        return float(self.stakes.sum())
+
+    def payout_table(self, n_pockets: int) -> np.ndarray:
+        """
+        Net return per unit of total stake for every pocket: one dot product
+        of the payout matrix with the stake vector.
+        """
+        return payout_matrix(n_pockets, self.bets) @ self.stakes / self.total_stake
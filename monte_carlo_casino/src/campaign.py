@@ -0,0 +1,182 @@
+import json
+import os
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from src import strategies
+from src.engine import RouletteEngine
+from src.stats import StreamingStats
+
+MANIFEST = "manifest.json"
+
+
+def _atomic_write_json(path: str, data: Dict):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _chunk_name(index: int) -> str:
+    return f"chunk_{index:05d}.npz"
+
+
+class Campaign:
+    """
+    A long simulation campaign written to disk chunk by chunk.
+
+    Each chunk of up to `chunk_size` runs is simulated with the batch engine
+    and saved as an .npz of columnar arrays (final_balances, ruin_spins and,
+    optionally, the balance matrix). The manifest records the configuration,
+    the number of completed chunks and the RNG state: chunk i always draws
+    from SeedSequence(entropy, spawn_key=(i,)), so the manifest stores the
+    master entropy and the next spawn key. An interrupted campaign resumes
+    from the last completed chunk and produces exactly the same output as
+    an uninterrupted one.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        strategy_class: Optional[type] = None,
+        n_runs: int = 100000,
+        n_spins: int = 200,
+        chunk_size: int = 10000,
+        seed: Optional[int] = None,
+        wheel_type: str = "European",
+        initial_capital: float = 1000,
+        initial_bet: float = 10,
+        record_balances: bool = True,
+    ):
+        self.directory = directory
+        path = os.path.join(directory, MANIFEST)
+
+        if os.path.exists(path):
+            with open(path) as f:
+                self.manifest = json.load(f)
+            config = self.manifest["config"]
+            if strategy_class is not None and strategy_class.__name__ != config["strategy"]:
+                raise ValueError(
+                    f"{directory} holds a {config['strategy']} campaign, not {strategy_class.__name__}"
+                )
+            self.strategy_class = strategy_class or getattr(strategies, config["strategy"])
+        else:
+            if strategy_class is None:
+                raise ValueError(f"No campaign in {directory}; a strategy_class is needed to start one")
+            os.makedirs(directory, exist_ok=True)
+            self.strategy_class = strategy_class
+            self.manifest = {
+                "config": {
+                    "strategy": strategy_class.__name__,
+                    "n_runs": n_runs,
+                    "n_spins": n_spins,
+                    "chunk_size": chunk_size,
+                    "wheel_type": wheel_type,
+                    "initial_capital": initial_capital,
+                    "initial_bet": initial_bet,
+                    "record_balances": record_balances,
+                },
+                "rng": {"entropy": str(np.random.SeedSequence(seed).entropy), "next_spawn_key": 0},
+                "completed_chunks": 0,
+                "chunks": [],
+                "balance_range": None,
+            }
+            _atomic_write_json(path, self.manifest)
+
+        self.config = self.manifest["config"]
+
+    @property
+    def n_chunks(self) -> int:
+        return -(-self.config["n_runs"] // self.config["chunk_size"])
+
+    @property
+    def complete(self) -> bool:
+        return self.manifest["completed_chunks"] >= self.n_chunks
+
+    def run(self, max_chunks: Optional[int] = None, verbose: bool = True) -> "CampaignReader":
+        """
+        Simulates the remaining chunks (at most max_chunks of them in this
+        call) and returns a reader over everything completed so far.
+        """
+        config = self.config
+        engine = RouletteEngine(type=config["wheel_type"], initial_capital=config["initial_capital"])
+        entropy = int(self.manifest["rng"]["entropy"])
+
+        start = self.manifest["completed_chunks"]
+        stop = self.n_chunks if max_chunks is None else min(self.n_chunks, start + max_chunks)
+        for index in range(start, stop):
+            size = min(config["chunk_size"], config["n_runs"] - index * config["chunk_size"])
+            result = engine.simulate_batch(
+                size, config["n_spins"], self.strategy_class,
+                initial_bet=config["initial_bet"],
+                seed=np.random.SeedSequence(entropy, spawn_key=(index,)),
+                record_balances=config["record_balances"],
+            )
+            arrays = {"final_balances": result.final_balances, "ruin_spins": result.ruin_spins}
+            if result.balances is not None:
+                arrays["balances"] = result.balances
+
+            # Chunk first, then manifest: a crash in between only redoes this chunk
+            name = _chunk_name(index)
+            tmp = os.path.join(self.directory, name + ".tmp.npz")
+            np.savez(tmp, **arrays)
+            os.replace(tmp, os.path.join(self.directory, name))
+
+            track = result.balances if result.balances is not None else result.final_balances
+            low, high = float(track.min()), float(track.max())
+            if self.manifest["balance_range"] is not None:
+                low = min(low, self.manifest["balance_range"][0])
+                high = max(high, self.manifest["balance_range"][1])
+            self.manifest["balance_range"] = [low, high]
+            self.manifest["chunks"].append({"file": name, "runs": size})
+            self.manifest["completed_chunks"] = index + 1
+            self.manifest["rng"]["next_spawn_key"] = index + 1
+            _atomic_write_json(os.path.join(self.directory, MANIFEST), self.manifest)
+
+            if verbose:
+                print(f"    chunk {index + 1}/{self.n_chunks} written ({size} runs)")
+
+        return CampaignReader(self.directory)
+
+
+class CampaignReader:
+    """
+    Lazy, chunk-at-a-time access to a campaign on disk. Nothing beyond the
+    manifest is loaded until a chunk is iterated.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        self.config = self.manifest["config"]
+
+    @property
+    def n_runs(self) -> int:
+        return sum(chunk["runs"] for chunk in self.manifest["chunks"])
+
+    @property
+    def balance_range(self) -> Optional[Tuple[float, float]]:
+        rng = self.manifest["balance_range"]
+        return None if rng is None else (rng[0], rng[1])
+
+    def iter_chunks(self, *fields: str) -> Iterator[Dict[str, np.ndarray]]:
+        """Yields one dict per completed chunk with the requested arrays."""
+        fields = fields or ("final_balances", "ruin_spins")
+        for chunk in self.manifest["chunks"]:
+            with np.load(os.path.join(self.directory, chunk["file"])) as data:
+                yield {field: data[field] for field in fields}
+
+    def iter_balances(self) -> Iterator[np.ndarray]:
+        if not self.config["record_balances"]:
+            raise ValueError("This campaign was run without record_balances")
+        for chunk in self.iter_chunks("balances"):
+            yield chunk["balances"]
+
+    def stats(self, **kwargs) -> StreamingStats:
+        """Streams every chunk through a StreamingStats accumulator."""
+        stats = StreamingStats(self.config["n_spins"], **kwargs)
+        for chunk in self.iter_chunks():
+            stats.add_batch(chunk["final_balances"], chunk["ruin_spins"])
+        return stats
@@ -1,5 +1,41 @@
 import random
-from typing import Dict, List, Union
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from src import bets
+from src.bets import BetLayout, DOUBLE_ZERO_INDEX, RED_POCKETS
+from src.recorder import HistoryRecorder
+from src.strategies import BatchStrategy, BettingStrategy, as_batch_strategy
+
+# Integer colour codes used by the array-based paths
+GREEN, RED, BLACK = 0, 1, 2
+COLOR_CODES = {"green": GREEN, "red": RED, "black": BLACK}
+
+
+@dataclass
+class BatchResult:
+    """
+    Outcome of a vectorized batch of simulation runs.
+
+    ruin_spins holds the number of spins completed before the player could
+    no longer cover the next bet, or -1 for runs that survived the horizon.
+    balances is the (n_runs, n_spins) bankroll after each spin, only kept
+    when requested.
+    """
+    final_balances: np.ndarray
+    ruin_spins: np.ndarray
+    balances: Optional[np.ndarray] = None
+
+    @property
+    def ruined(self) -> np.ndarray:
+        return self.ruin_spins >= 0
+
+    @property
+    def ruin_probability(self) -> float:
+        return float(self.ruined.mean())
+
 
 class RouletteEngine:
     """
@@ -7,62 +43,123 @@ class RouletteEngine:
     Designed to provide data streams for Monte Carlo analysis.
     """
 
-    def __init__(self, type: str = "European", initial_capital: float = 1000.0):
+    def __init__(
+        self,
+        type: str = "European",
+        initial_capital: float = 1000.0,
+        rng: Optional[np.random.Generator] = None,
+        recorder: Optional[HistoryRecorder] = None,
+    ):
         self.type = type
         self.initial_capital = initial_capital
         self.current_balance = initial_capital
-        
+
         # Setup wheel mechanics
         # European: 0 (Green), 1-36 (Red/Black)
         # American: 0, 00 (Green), 1-36 (Red/Black)
         self.pockets = list(range(37))
         if type.lower() == "american":
             self.pockets.append("00")
-            
+
+        # Lookup table: pocket index -> colour code, shared by the batch path
+        self.color_lut = np.array(
+            [COLOR_CODES[self._get_color(p)] for p in self.pockets], dtype=np.int8
+        )
+
+        # Optional private stream; without one, spins draw from the global
+        # `random` module as they always have
+        self.rng = rng
+
+        # Payout tables per (bet_type, bet_value), built on first use
+        self._payout_tables: Dict[tuple, np.ndarray] = {}
+
+        # Without a recorder every spin is kept as a dict in self.history
+        self.recorder = recorder
+        if recorder is not None:
+            recorder.reset(initial_capital)
+
         self.history: List[Dict[str, Union[int, str, float]]] = []
 
+    @property
+    def n_pockets(self) -> int:
+        return len(self.pockets)
+
     def _get_color(self, pocket: Union[int, str]) -> str:
         """Determines the color of the pocket based on standard roulette layouts."""
         if pocket in [0, "00"]:
             return "green"
-        
-        # Standard Red/Black distribution
-        red_pockets = {1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36}
-        return "red" if pocket in red_pockets else "black"
+
+        return "red" if pocket in RED_POCKETS else "black"
+
+    def payout_table(self, bet_type: str, bet_value: Union[int, str, BetLayout]) -> np.ndarray:
+        """
+        Net return per unit staked for every pocket index.
+
+        For a single bet a winning pocket maps to its payout ratio and every
+        other pocket to -1; a 'layout' bet_value resolves all of its bets at
+        once, per unit of total stake. Tables are cached and read-only.
+        """
+        key = (bet_type, bet_value)
+        table = self._payout_tables.get(key)
+        if table is None:
+            table = self._layout_for(bet_type, bet_value).payout_table(self.n_pockets)
+            table.setflags(write=False)
+            self._payout_tables[key] = table
+        return table
+
+    def _layout_for(self, bet_type: str, bet_value: Union[int, str, BetLayout]) -> BetLayout:
+        """
+        The layout behind a bet. Colour and straight-up bets keep their
+        original semantics: a colour wins 1:1 on the pockets of that colour
+        (so 'green' wins on 0 and 00), and a colour or number the wheel does
+        not have simply loses every spin rather than raising.
+        """
+        if bet_type == "layout":
+            return bet_value
+        if bet_type == "color":
+            if bet_value in ("red", "black"):
+                return BetLayout([bets.color(bet_value)])      # 1:1 payout
+            greens = tuple(i for i, p in enumerate(self.pockets) if bet_value == "green" and p in (0, "00"))
+            return BetLayout([bets.Bet(str(bet_value), greens, 1)])
+        if bet_type == "straight_up":
+            if bet_value in self.pockets:
+                return BetLayout([bets.straight(bet_value)])   # 35:1 payout
+            return BetLayout([bets.Bet(f"straight {bet_value}", (), 35)])
+        raise ValueError(f"Unsupported bet_type: {bet_type}")
+
+    def payout_matrix(self, layout: BetLayout) -> np.ndarray:
+        """The (pocket x bet) net-return matrix of a layout on this wheel."""
+        return bets.payout_matrix(self.n_pockets, layout.bets)
 
     def spin(self, bet_amount: float, bet_type: str, bet_value: Union[int, str]) -> Dict:
         """
         Executes a single spin and resolves the bet.
-        
+
         Args:
             bet_amount: Capital allocated to this spin.
-            bet_type: 'color' (red/black) or 'straight_up' (single number).
-            bet_value: The target (e.g., 'red', 17, 'black').
+            bet_type: 'color' (red/black), 'straight_up' (single number)
+                or 'layout' (several bets at once).
+            bet_value: The target (e.g., 'red', 17, 'black'), or a
+                BetLayout across which bet_amount is split.
         """
         if bet_amount > self.current_balance:
             return {"error": "Insufficient funds"}
 
         # Random pocket selection
-        outcome = random.choice(self.pockets)
+        if self.rng is None:
+            outcome = random.choice(self.pockets)
+        else:
+            outcome = self.pockets[self.rng.integers(self.n_pockets)]
         outcome_color = self._get_color(outcome)
-        
-        win = False
-        payout_ratio = 0
-
-        # Logic for payouts
-        if bet_type == "color" and bet_value == outcome_color:
-            win = True
-            payout_ratio = 1  # 1:1 payout
-        elif bet_type == "straight_up" and bet_value == outcome:
-            win = True
-            payout_ratio = 35 # 35:1 payout
+        pocket_index = DOUBLE_ZERO_INDEX if outcome == "00" else outcome
+
+        # Net return per unit staked, from the precomputed payout table; kept
+        # as Python scalars so records hold plain floats and bools
+        payout_ratio = float(self.payout_table(bet_type, bet_value)[pocket_index])
+        win = payout_ratio > 0
 
         # Update balance
-        if win:
-            reward = bet_amount * payout_ratio
-            self.current_balance += reward
-        else:
-            self.current_balance -= bet_amount
+        self.current_balance += bet_amount * payout_ratio
 
         # Record state for the Data Analyst's future analysis
         record = {
@@ -72,10 +169,153 @@ class RouletteEngine:
             "result": "win" if win else "loss",
             "balance": self.current_balance
         }
-        self.history.append(record)
+        if self.recorder is None:
+            self.history.append(record)
+        else:
+            self.recorder.record(
+                pocket_index, COLOR_CODES[outcome_color], bet_amount, win, self.current_balance
+            )
         return record
 
+    def play(self, strategy, spins: int, bet_type: str = "color", bet_value: Union[int, str] = "red"):
+        """
+        Plays one life of up to `spins` spins with the given strategy,
+        stopping early once the balance can no longer cover the next bet.
+
+        Returns the number of spins completed before ruin, or -1 if the
+        player lasted the whole horizon. A strategy with a `layout` plays
+        that layout instead of bet_type/bet_value.
+        """
+        if getattr(strategy, "layout", None) is not None:
+            bet_type, bet_value = "layout", strategy.layout
+        current_bet = strategy.initial_bet
+
+        for spin_index in range(spins):
+            if self.current_balance < current_bet:
+                if self.recorder is not None:
+                    self.recorder.mark_ruined(spin_index)
+                return spin_index # Player is "Ruined"
+
+            result = self.spin(current_bet, bet_type=bet_type, bet_value=bet_value)
+            current_bet = strategy.update(result)
+
+        return -1
+
+    def draw_pockets(
+        self,
+        n_runs: int,
+        n_spins: int,
+        seed: Optional[Union[int, np.random.SeedSequence]] = None,
+        antithetic: bool = False,
+    ) -> np.ndarray:
+        """
+        Draws an (n_runs, n_spins) matrix of pocket indices.
+
+        With antithetic=True only the first half of the rows is sampled; row
+        i + n_runs // 2 is row i passed through antithetic_map, so each pair
+        sees mirrored colour outcomes. n_runs must then be even.
+        """
+        rng = np.random.default_rng(seed)
+        if not antithetic:
+            return rng.integers(0, self.n_pockets, size=(n_runs, n_spins), dtype=np.int8)
+        if n_runs % 2:
+            raise ValueError("Antithetic pairing needs an even number of runs.")
+        half = rng.integers(0, self.n_pockets, size=(n_runs // 2, n_spins), dtype=np.int8)
+        return np.concatenate([half, self.antithetic_map[half]])
+
+    @property
+    def antithetic_map(self) -> np.ndarray:
+        """
+        Pocket permutation that swaps every red pocket with a black one and
+        fixes the greens. It preserves the uniform pocket distribution while
+        turning each even-money win into a loss and vice versa.
+        """
+        mapping = np.arange(self.n_pockets, dtype=np.int8)
+        reds = np.flatnonzero(self.color_lut == RED)
+        blacks = np.flatnonzero(self.color_lut == BLACK)
+        mapping[reds] = blacks
+        mapping[blacks] = reds
+        return mapping
+
+    def simulate_batch(
+        self,
+        n_runs: int,
+        n_spins: int,
+        strategy: Union[type, BatchStrategy, BettingStrategy],
+        initial_bet: float = 10,
+        bet_type: str = "color",
+        bet_value: Union[int, str, BetLayout] = "red",
+        seed: Optional[Union[int, np.random.SeedSequence]] = None,
+        record_balances: bool = False,
+        pockets: Optional[np.ndarray] = None,
+    ) -> BatchResult:
+        """
+        Simulates n_runs independent lives of n_spins each in lock-step.
+
+        All pockets are drawn up front as an (n_runs, n_spins) integer matrix
+        and resolved through precomputed lookup tables, so the Python loop
+        runs once per spin rather than once per spin per run. A run stops
+        (is "ruined") as soon as its balance cannot cover the next bet,
+        matching the rule used by run_simulation in main.py.
+
+        `strategy` may be a BatchStrategy instance, a strategy class or a
+        BettingStrategy instance (which brings its own initial_bet and
+        layout); those without an array port run through
+        ScalarStrategyAdapter.
+        A pre-drawn (n_runs, n_spins) `pockets` matrix, e.g. from
+        draw_pockets, replaces the seeded draw so several strategies can
+        face identical spins.
+        """
+        strategy = as_batch_strategy(strategy, initial_bet)
+        if getattr(strategy, "layout", None) is not None:
+            bet_type, bet_value = "layout", strategy.layout
+        payouts = self.payout_table(bet_type, bet_value)
+        if pockets is None:
+            pockets = self.draw_pockets(n_runs, n_spins, seed)
+        elif pockets.shape != (n_runs, n_spins):
+            raise ValueError(f"pockets must have shape {(n_runs, n_spins)}, got {pockets.shape}")
+
+        balance = np.full(n_runs, float(self.initial_capital))
+        ruin_spins = np.full(n_runs, -1, dtype=np.int64)
+        active = np.ones(n_runs, dtype=bool)
+        history = np.empty((n_runs, n_spins)) if record_balances else None
+
+        bet = strategy.reset(n_runs)
+
+        for t in range(n_spins):
+            newly_ruined = active & (balance < bet)
+            ruin_spins[newly_ruined] = t
+            active &= ~newly_ruined
+
+            spun = pockets[:, t]
+            net = payouts[spun]
+            balance += np.where(active, bet * net, 0.0)
+            results = {
+                "pocket": spun,
+                "color": self.color_lut[spun],
+                "bet_amount": bet,
+                "win": net > 0,
+                "balance": balance,
+            }
+            bet = np.where(active, strategy.update(results, active), bet)
+
+            if history is not None:
+                history[:, t] = balance
+
+        return BatchResult(final_balances=balance, ruin_spins=ruin_spins, balances=history)
+
+    def collect_history(self):
+        """
+        The current run's history: the dict list by default, otherwise
+        whatever the recorder keeps (columnar arrays or a summary).
+        """
+        if self.recorder is None:
+            return self.history
+        return self.recorder.finish()
+
     def reset(self):
         """Reset the engine for a new simulation run."""
         self.current_balance = self.initial_capital
-        self.history = []
\ No newline at end of file
+        self.history = []
+        if self.recorder is not None:
+            self.recorder.reset(self.initial_capital)
@@ -0,0 +1,212 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple, Union
+
+import numpy as np
+from scipy import sparse
+
+from src.engine import BatchResult, RouletteEngine
+from src.strategies import ConstantBet, Martingale, Fibonacci
+
+
+@dataclass
+class StrategyChain:
+    """
+    A strategy written as a finite-state machine: an integer state, the bet
+    placed in each state and the state reached after a win or a loss.
+    """
+    initial_state: int
+    bet: Callable[[int], float]
+    next_state: Callable[[int, bool], int]
+
+
+def constant_chain(initial_bet: float) -> StrategyChain:
+    return StrategyChain(0, lambda s: initial_bet, lambda s, win: 0)
+
+
+def martingale_chain(initial_bet: float) -> StrategyChain:
+    # State = number of consecutive losses, so the bet is initial_bet * 2^state
+    return StrategyChain(0, lambda s: initial_bet * 2 ** s, lambda s, win: 0 if win else s + 1)
+
+
+def fibonacci_chain(initial_bet: float) -> StrategyChain:
+    # State = the Fibonacci strategy's `ptr`
+    sequence = Fibonacci(initial_bet).sequence
+    top = len(sequence) - 1
+    return StrategyChain(
+        0,
+        lambda s: initial_bet * sequence[s],
+        lambda s, win: max(0, s - 2) if win else min(top, s + 1),
+    )
+
+
+STRATEGY_CHAINS = {
+    ConstantBet: constant_chain,
+    Martingale: martingale_chain,
+    Fibonacci: fibonacci_chain,
+}
+
+
+@dataclass
+class ExactResult:
+    """
+    Exact distribution of a strategy's outcome after `n_spins`.
+
+    ruin_time_pmf[t] is the probability that the player is ruined after
+    exactly t spins (the balance can no longer cover the next bet), using
+    the same convention as BatchResult.ruin_spins.
+    """
+    balances: np.ndarray
+    probabilities: np.ndarray
+    ruin_time_pmf: np.ndarray
+    n_states: int
+
+    @property
+    def ruin_probability(self) -> float:
+        return float(self.ruin_time_pmf.sum())
+
+    @property
+    def mean(self) -> float:
+        return float(self.balances @ self.probabilities)
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(((self.balances - self.mean) ** 2) @ self.probabilities))
+
+    def quantile(self, q: float) -> float:
+        cdf = np.cumsum(self.probabilities)
+        return float(self.balances[min(np.searchsorted(cdf, q), len(cdf) - 1)])
+
+    def validate(self, sample: BatchResult) -> Dict[str, float]:
+        """
+        Compares Monte Carlo output against the exact answer. The z-scores
+        should stay within a few units if the simulation is unbiased.
+        """
+        n = len(sample.final_balances)
+        p = self.ruin_probability
+        ruin_se = np.sqrt(p * (1 - p) / n) if 0 < p < 1 else np.inf
+        sample_mean = float(sample.final_balances.mean())
+        if self.std > 0:
+            mean_z = (sample_mean - self.mean) / (self.std / np.sqrt(n))
+        else:
+            # A degenerate outcome: any sample that differs is impossible
+            mean_z = 0.0 if np.isclose(sample_mean, self.mean) else np.inf
+        return {
+            "exact_mean": self.mean,
+            "sample_mean": sample_mean,
+            "mean_z": float(mean_z),
+            "exact_ruin": p,
+            "sample_ruin": sample.ruin_probability,
+            "ruin_z": float((sample.ruin_probability - p) / ruin_se),
+        }
+
+
+class ExactRuinSolver:
+    """
+    Computes risk of ruin exactly instead of by sampling.
+
+    Bankroll plus strategy state is a finite Markov chain over a fixed
+    horizon. The solver enumerates the states reachable within `n_spins`,
+    builds the sparse transition matrix (ruined states are absorbing) and
+    pushes the start distribution through it with one sparse mat-vec per
+    spin.
+
+    The state space stays small for even-money bets, but high-payout bets
+    under progressive strategies can branch into many distinct bankrolls;
+    build() stops with a ValueError beyond `max_states`.
+    """
+
+    def __init__(
+        self,
+        strategy_class: type,
+        type: str = "European",
+        initial_capital: float = 1000,
+        initial_bet: float = 10,
+        bet_type: str = "color",
+        bet_value: Union[int, str] = "red",
+        max_states: int = 1_000_000,
+    ):
+        if strategy_class not in STRATEGY_CHAINS:
+            raise ValueError(f"No exact chain available for {strategy_class.__name__}")
+        self.chain = STRATEGY_CHAINS[strategy_class](initial_bet)
+        self.initial_capital = float(initial_capital)
+        self.max_states = max_states
+
+        # Collapse the wheel to its distinct net outcomes per unit staked
+        payouts = RouletteEngine(type=type).payout_table(bet_type, bet_value)
+        nets, counts = np.unique(payouts, return_counts=True)
+        self.outcomes: List[Tuple[float, float]] = list(zip(nets.tolist(), (counts / len(payouts)).tolist()))
+
+    def _is_ruined(self, state: Tuple[float, int]) -> bool:
+        balance, s = state
+        return balance < self.chain.bet(s)
+
+    def build(self, n_spins: int) -> Tuple[sparse.csr_matrix, List[Tuple[float, int]]]:
+        """
+        Enumerates states reachable within n_spins and returns the transition
+        matrix P (row = from, column = to) alongside the state list.
+        """
+        start = (self.initial_capital, self.chain.initial_state)
+        index = {start: 0}
+        states = [start]
+        rows, cols, probs = [], [], []
+        frontier = [start]
+
+        for _ in range(n_spins):
+            next_frontier = []
+            for state in frontier:
+                i = index[state]
+                if self._is_ruined(state):
+                    continue
+                balance, s = state
+                bet = self.chain.bet(s)
+                for net, p in self.outcomes:
+                    target = (balance + bet * net, self.chain.next_state(s, net > 0))
+                    j = index.get(target)
+                    if j is None:
+                        if len(states) >= self.max_states:
+                            raise ValueError(
+                                f"State space exceeds {self.max_states} states; "
+                                "shorten the horizon or raise max_states."
+                            )
+                        j = index[target] = len(states)
+                        states.append(target)
+                        next_frontier.append(target)
+                    rows.append(i)
+                    cols.append(j)
+                    probs.append(p)
+            frontier = next_frontier
+
+        # Ruined states, and states first reached on the last spin, hold still
+        has_exits = np.zeros(len(states), dtype=bool)
+        has_exits[rows] = True
+        stay = np.flatnonzero(~has_exits)
+        rows.extend(stay.tolist())
+        cols.extend(stay.tolist())
+        probs.extend([1.0] * len(stay))
+
+        matrix = sparse.csr_matrix((probs, (rows, cols)), shape=(len(states), len(states)))
+        return matrix, states
+
+    def solve(self, n_spins: int) -> ExactResult:
+        matrix, states = self.build(n_spins)
+        step = matrix.T.tocsr()
+        ruined = np.array([self._is_ruined(s) for s in states])
+
+        dist = np.zeros(len(states))
+        dist[0] = 1.0
+        ruined_mass = np.empty(n_spins)
+        for t in range(n_spins):
+            # Ruin is checked before spin t, i.e. after t spins have been played
+            ruined_mass[t] = dist[ruined].sum()
+            dist = step @ dist
+
+        balances = np.array([b for b, _ in states])
+        values, inverse = np.unique(balances, return_inverse=True)
+        probabilities = np.bincount(inverse, weights=dist, minlength=len(values))
+
+        return ExactResult(
+            balances=values,
+            probabilities=probabilities,
+            ruin_time_pmf=np.diff(ruined_mass, prepend=0.0),
+            n_states=len(states),
+        )
@@ -0,0 +1,136 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.engine import RouletteEngine
+from src.recorder import make_recorder
+from src.stats import StreamingStats
+
+
+def run_seed(entropy: int, run_index: int) -> np.random.SeedSequence:
+    """
+    The independent stream of a single run within a campaign.
+
+    Equivalent to SeedSequence(entropy).spawn(...)[run_index], but without
+    materialising every sibling first.
+    """
+    return np.random.SeedSequence(entropy, spawn_key=(run_index,))
+
+
+# Progress lines per campaign on one worker; more workers report per block
+PROGRESS_REPORTS = 4
+
+
+def report_progress(stats: StreamingStats) -> None:
+    """Prints the running statistics of a campaign in progress."""
+    print(f"    {stats.progress_line()}")
+
+
+def simulate_runs(
+    strategy_class: type,
+    entropy: int,
+    start: int,
+    stop: int,
+    spins_per_run: int,
+    wheel_type: str = "European",
+    initial_capital: float = 1000,
+    initial_bet: float = 10,
+    history_mode: str = "dicts",
+    stats: Optional[StreamingStats] = None,
+) -> Tuple[list, List[float]]:
+    """
+    Plays runs [start, stop) of a campaign, each on its own seeded stream,
+    feeding every finished run into `stats` when one is given.
+    """
+    all_histories = []
+    final_balances = []
+    engine = RouletteEngine(
+        type=wheel_type,
+        initial_capital=initial_capital,
+        recorder=make_recorder(history_mode, spins_per_run),
+    )
+
+    for run_index in range(start, stop):
+        engine.reset()
+        engine.rng = np.random.default_rng(run_seed(entropy, run_index))
+        strategy = strategy_class(initial_bet=initial_bet)
+        ruin_spin = engine.play(strategy, spins_per_run)
+
+        all_histories.append(engine.collect_history())
+        final_balances.append(engine.current_balance)
+        if stats is not None:
+            stats.add(engine.current_balance, ruin_spin)
+
+    return all_histories, final_balances
+
+
+def _simulate_block(args):
+    *run_args, stats = args
+    histories, finals = simulate_runs(*run_args, stats=stats)
+    return histories, finals, stats
+
+
+def run_parallel_simulation(
+    strategy_class: type,
+    num_runs: int = 100,
+    spins_per_run: int = 100,
+    seed: Optional[int] = None,
+    n_workers: Optional[int] = None,
+    wheel_type: str = "European",
+    initial_capital: float = 1000,
+    initial_bet: float = 10,
+    history_mode: str = "dicts",
+    stats: Optional[StreamingStats] = None,
+) -> Tuple[list, List[float]]:
+    """
+    Splits a campaign of num_runs across a process pool.
+
+    Each run's stream is spawned from one master seed by run index, so the
+    histories and final balances come back in run order and are
+    bit-identical for any n_workers. With seed=None fresh entropy is drawn
+    and printed so the campaign can still be replayed.
+
+    If `stats` is given, each block feeds its own accumulator in the worker;
+    these are merged into `stats` in run order as blocks complete, with a
+    progress line printed after each one.
+    """
+    entropy = np.random.SeedSequence(seed).entropy
+    n_workers = n_workers or os.cpu_count() or 1
+
+    print(
+        f"--- Running {num_runs} simulations for {strategy_class.__name__} "
+        f"on {n_workers} worker(s), seed={entropy} ---"
+    )
+
+    # A few blocks per worker keeps the pool balanced when runs end early
+    n_blocks = min(num_runs, n_workers * PROGRESS_REPORTS) or 1
+    bounds = np.linspace(0, num_runs, n_blocks + 1).astype(int)
+    tasks = [
+        (strategy_class, entropy, int(lo), int(hi), spins_per_run,
+         wheel_type, initial_capital, initial_bet, history_mode,
+         stats.empty_copy() if stats is not None else None)
+        for lo, hi in zip(bounds[:-1], bounds[1:])
+    ]
+
+    if n_workers == 1:
+        results = map(_simulate_block, tasks)
+    else:
+        pool = ProcessPoolExecutor(max_workers=n_workers)
+        results = pool.map(_simulate_block, tasks)
+
+    all_histories = []
+    final_balances = []
+    try:
+        for histories, finals, block_stats in results:
+            all_histories.extend(histories)
+            final_balances.extend(finals)
+            if stats is not None:
+                stats.merge(block_stats)
+                report_progress(stats)
+    finally:
+        if n_workers != 1:
+            pool.shutdown()
+
+    return all_histories, final_balances
@@ -0,0 +1,164 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+
+@dataclass
+class ColumnarHistory:
+    """
+    Struct-of-arrays view of one run.
+
+    Pockets are stored as int8 indices (the American "00" is index 37) and
+    colours as the engine's integer codes. Fields a recorder does not keep
+    are left as None; `balance` is always present.
+    """
+    initial_capital: float
+    balance: np.ndarray
+    pocket: Optional[np.ndarray] = None
+    color: Optional[np.ndarray] = None
+    bet_amount: Optional[np.ndarray] = None
+    win: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.balance)
+
+
+@dataclass
+class RunSummary:
+    """The handful of numbers most analyses need from a run."""
+    initial_capital: float
+    final_balance: float
+    peak: float
+    trough: float
+    n_spins: int
+    ruin_spin: int = -1  # spins completed before ruin, -1 if never ruined
+
+
+class HistoryRecorder(ABC):
+    """
+    Receives every resolved spin from the engine.
+
+    The engine calls reset() at the start of each run, record() after each
+    spin and mark_ruined() if the run ends early; finish() returns what was
+    kept for the run.
+    """
+
+    def reset(self, initial_capital: float):
+        self.initial_capital = initial_capital
+        self.n = 0
+
+    @abstractmethod
+    def record(self, pocket: int, color: int, bet_amount: float, win: bool, balance: float):
+        pass
+
+    def mark_ruined(self, spin: int):
+        pass
+
+    @abstractmethod
+    def finish(self):
+        pass
+
+
+class FullRecorder(HistoryRecorder):
+    """Keeps every field in preallocated, fixed-width column buffers."""
+
+    def __init__(self, capacity: int):
+        self.pocket = np.empty(capacity, dtype=np.int8)
+        self.color = np.empty(capacity, dtype=np.int8)
+        self.bet_amount = np.empty(capacity, dtype=np.float64)
+        self.balance = np.empty(capacity, dtype=np.float64)
+        self.win = np.empty(capacity, dtype=bool)
+
+    def record(self, pocket, color, bet_amount, win, balance):
+        i = self.n
+        self.pocket[i] = pocket
+        self.color[i] = color
+        self.bet_amount[i] = bet_amount
+        self.balance[i] = balance
+        self.win[i] = win
+        self.n = i + 1
+
+    def finish(self) -> ColumnarHistory:
+        # Copy out so the buffers can be reused by the next run
+        n = self.n
+        return ColumnarHistory(
+            initial_capital=self.initial_capital,
+            balance=self.balance[:n].copy(),
+            pocket=self.pocket[:n].copy(),
+            color=self.color[:n].copy(),
+            bet_amount=self.bet_amount[:n].copy(),
+            win=self.win[:n].copy(),
+        )
+
+
+class BalanceRecorder(HistoryRecorder):
+    """Keeps only the bankroll trajectory."""
+
+    def __init__(self, capacity: int):
+        self.balance = np.empty(capacity, dtype=np.float64)
+
+    def record(self, pocket, color, bet_amount, win, balance):
+        self.balance[self.n] = balance
+        self.n += 1
+
+    def finish(self) -> ColumnarHistory:
+        return ColumnarHistory(
+            initial_capital=self.initial_capital,
+            balance=self.balance[:self.n].copy(),
+        )
+
+
+class SummaryRecorder(HistoryRecorder):
+    """Keeps a constant-size summary: final balance, peak, trough and ruin spin."""
+
+    def reset(self, initial_capital: float):
+        super().reset(initial_capital)
+        self.final = self.peak = self.trough = initial_capital
+        self.ruin_spin = -1
+
+    def record(self, pocket, color, bet_amount, win, balance):
+        self.final = balance
+        if balance > self.peak:
+            self.peak = balance
+        if balance < self.trough:
+            self.trough = balance
+        self.n += 1
+
+    def mark_ruined(self, spin: int):
+        self.ruin_spin = spin
+
+    def finish(self) -> RunSummary:
+        return RunSummary(
+            initial_capital=self.initial_capital,
+            final_balance=self.final,
+            peak=self.peak,
+            trough=self.trough,
+            n_spins=self.n,
+            ruin_spin=self.ruin_spin,
+        )
+
+
+RECORDERS = {
+    "full": FullRecorder,
+    "balance": BalanceRecorder,
+    "summary": SummaryRecorder,
+}
+
+
+def make_recorder(mode: str, capacity: int) -> Optional[HistoryRecorder]:
+    """
+    Builds the recorder for a history mode.
+
+    'dicts' returns None, which keeps the engine's original list-of-dicts
+    history.
+    """
+    if mode == "dicts":
+        return None
+    if mode == "summary":
+        return SummaryRecorder()
+    try:
+        return RECORDERS[mode](capacity)
+    except KeyError:
+        raise ValueError(f"Unknown history mode: {mode}")
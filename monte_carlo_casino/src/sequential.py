@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Optional, Tuple
+
+import numpy as np
+
+from src.engine import RouletteEngine
+from src.stats import StreamingStats
+
+
+@dataclass
+class PrecisionResult:
+    """Outcome of a precision-targeted campaign."""
+    metric: str
+    estimate: float
+    interval: Tuple[float, float]
+    n_runs: int
+    converged: bool
+    stats: StreamingStats
+
+    @property
+    def half_width(self) -> float:
+        return (self.interval[1] - self.interval[0]) / 2
+
+
+def _interval(stats: StreamingStats, metric: str, z: float) -> Tuple[float, Tuple[float, float]]:
+    if metric == "mean":
+        return stats.mean, stats.mean_interval(z)
+    if metric == "ruin":
+        return stats.ruin_probability, stats.ruin_interval(z)
+    raise ValueError(f"Unknown metric: {metric} (expected 'mean' or 'ruin')")
+
+
+def run_to_precision(
+    strategy_class: type,
+    target_half_width: float,
+    metric: str = "mean",
+    confidence: float = 0.95,
+    spins_per_run: int = 200,
+    batch_size: int = 1000,
+    max_runs: int = 1_000_000,
+    seed: Optional[int] = None,
+    engine: Optional[RouletteEngine] = None,
+    initial_bet: float = 10,
+    verbose: bool = True,
+) -> PrecisionResult:
+    """
+    Runs batches of simulations until the confidence interval of the chosen
+    metric ('mean' final balance or 'ruin' probability) is no wider than
+    +/- target_half_width, or until max_runs have been spent.
+
+    After each batch the runs still needed are projected from the current
+    half-width (it shrinks like 1/sqrt(n)), and the next batch is sized
+    towards that projection, never more than doubling the runs so far.
+    Batch i draws from SeedSequence(seed, spawn_key=(i,)), so a seeded
+    campaign is reproducible.
+    """
+    engine = engine or RouletteEngine()
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    entropy = np.random.SeedSequence(seed).entropy
+    stats = StreamingStats(spins_per_run)
+
+    size = min(batch_size, max_runs)
+    batch_index = 0
+    while True:
+        result = engine.simulate_batch(
+            size, spins_per_run, strategy_class, initial_bet=initial_bet,
+            seed=np.random.SeedSequence(entropy, spawn_key=(batch_index,)),
+        )
+        stats.add_batch(result.final_balances, result.ruin_spins)
+        batch_index += 1
+
+        estimate, (low, high) = _interval(stats, metric, z)
+        half_width = (high - low) / 2
+        if verbose:
+            print(f"    {stats.progress_line()} half-width={half_width:.4g}")
+
+        converged = half_width <= target_half_width
+        if converged or stats.count >= max_runs:
+            break
+
+        projected = int(np.ceil(stats.count * (half_width / target_half_width) ** 2))
+        size = int(min(max(batch_size, projected - stats.count), stats.count, max_runs - stats.count))
+
+    return PrecisionResult(
+        metric=metric,
+        estimate=estimate,
+        interval=(low, high),
+        n_runs=stats.count,
+        converged=converged,
+        stats=stats,
+    )
@@ -0,0 +1,223 @@
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+
+def wilson_interval(successes: int, trials: int, z: float = 1.96) -> Tuple[float, float]:
+    """Wilson score interval for a binomial proportion."""
+    if trials == 0:
+        return 0.0, 1.0
+    p = successes / trials
+    denom = 1 + z ** 2 / trials
+    centre = (p + z ** 2 / (2 * trials)) / denom
+    half = z * math.sqrt(p * (1 - p) / trials + z ** 2 / (4 * trials ** 2)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch with a relative-accuracy guarantee.
+
+    Every value v > 0 lands in bucket ceil(log_gamma(v)), so any quantile is
+    answered to within `relative_accuracy` of a true sample value. Buckets
+    are plain integer counts, which makes merging exact and
+    order-independent. Zero and negative values are kept in their own
+    buckets so losses can be sketched too.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = defaultdict(int)
+        self.negative: Dict[int, int] = defaultdict(int)
+        self.zero_count = 0
+        self.count = 0
+
+    def _key(self, value: float) -> int:
+        return int(math.ceil(math.log(value) / self._log_gamma))
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value: float):
+        if value > 0:
+            self.positive[self._key(value)] += 1
+        elif value < 0:
+            self.negative[self._key(-value)] += 1
+        else:
+            self.zero_count += 1
+        self.count += 1
+
+    def add_many(self, values: np.ndarray):
+        values = np.asarray(values, dtype=float)
+        for store, part in ((self.positive, values[values > 0]), (self.negative, -values[values < 0])):
+            if len(part):
+                keys, counts = np.unique(
+                    np.ceil(np.log(part) / self._log_gamma).astype(np.int64), return_counts=True
+                )
+                for key, c in zip(keys.tolist(), counts.tolist()):
+                    store[key] += c
+        self.zero_count += int(np.count_nonzero(values == 0))
+        self.count += len(values)
+
+    def merge(self, other: "QuantileSketch"):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy.")
+        for store, incoming in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, c in incoming.items():
+                store[key] += c
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return float("nan")
+        rank = q * (self.count - 1)
+        seen = 0
+        # Walk buckets in ascending value order: most negative first
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive))
+
+
+class StreamingStats:
+    """
+    Constant-memory summary of a Monte Carlo campaign, fed one run (or one
+    batch of runs) at a time.
+
+    Tracks mean/variance with Welford's algorithm, min/max, ruin
+    probability, a histogram of time-to-ruin and a quantile sketch of final
+    balances. Accumulators from separate workers combine with merge(), using
+    Chan's pairwise update for the moments and count addition for the rest.
+    """
+
+    def __init__(self, n_spins: int, ruin_bins: int = 20, relative_accuracy: float = 0.01):
+        self.n_spins = n_spins
+        self.ruin_edges = np.linspace(0, n_spins, ruin_bins + 1)
+        self.ruin_histogram = np.zeros(ruin_bins, dtype=np.int64)
+        self.sketch = QuantileSketch(relative_accuracy)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.ruined = 0
+
+    def empty_copy(self) -> "StreamingStats":
+        """A fresh accumulator with the same bins and sketch accuracy, e.g. for a worker."""
+        return StreamingStats(self.n_spins, len(self.ruin_histogram), self.sketch.relative_accuracy)
+
+    def add(self, final_balance: float, ruin_spin: int = -1):
+        """Feeds a single run; ruin_spin is -1 for runs that survived."""
+        self.count += 1
+        delta = final_balance - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (final_balance - self.mean)
+        self.min = min(self.min, final_balance)
+        self.max = max(self.max, final_balance)
+        self.sketch.add(final_balance)
+        if ruin_spin >= 0:
+            self.ruined += 1
+            self._bin_ruin(np.array([ruin_spin]))
+
+    def add_batch(self, final_balances: np.ndarray, ruin_spins: Optional[np.ndarray] = None):
+        """Feeds many runs at once, e.g. a BatchResult from simulate_batch."""
+        final_balances = np.asarray(final_balances, dtype=float)
+        if len(final_balances) == 0:
+            return
+        batch = self.empty_copy()
+        batch.count = len(final_balances)
+        batch.mean = float(final_balances.mean())
+        batch.m2 = float(((final_balances - batch.mean) ** 2).sum())
+        batch.min = float(final_balances.min())
+        batch.max = float(final_balances.max())
+        batch.sketch.add_many(final_balances)
+        if ruin_spins is not None:
+            ruin_spins = np.asarray(ruin_spins)
+            hit = ruin_spins[ruin_spins >= 0]
+            batch.ruined = len(hit)
+            batch._bin_ruin(hit)
+        self.merge(batch)
+
+    def _bin_ruin(self, ruin_spins: np.ndarray):
+        counts, _ = np.histogram(ruin_spins, bins=self.ruin_edges)
+        self.ruin_histogram += counts
+
+    def merge(self, other: "StreamingStats") -> "StreamingStats":
+        if not np.array_equal(self.ruin_edges, other.ruin_edges):
+            raise ValueError("Cannot merge accumulators with different ruin bins.")
+        if other.count:
+            total = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / total
+            self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+            self.count = total
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self.ruined += other.ruined
+            self.ruin_histogram += other.ruin_histogram
+            self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def mean_interval(self, z: float = 1.96) -> Tuple[float, float]:
+        half = z * self.std / math.sqrt(self.count) if self.count else math.inf
+        return self.mean - half, self.mean + half
+
+    @property
+    def ruin_probability(self) -> float:
+        return self.ruined / self.count if self.count else 0.0
+
+    def ruin_interval(self, z: float = 1.96) -> Tuple[float, float]:
+        return wilson_interval(self.ruined, self.count, z)
+
+    def quantile(self, q: float) -> float:
+        return self.sketch.quantile(q)
+
+    def summary(self) -> Dict[str, float]:
+        low, high = self.ruin_interval()
+        return {
+            "Runs": self.count,
+            "Avg Final Balance": self.mean,
+            "Std Dev": self.std,
+            "Max Final": self.max,
+            "Min Final": self.min,
+            "Median": self.quantile(0.5),
+            "Ruin %": 100 * self.ruin_probability,
+            "Ruin % CI": f"[{100 * low:.1f}, {100 * high:.1f}]",
+        }
+
+    def progress_line(self) -> str:
+        low, high = self.ruin_interval()
+        return (
+            f"runs={self.count} mean={self.mean:.2f}±{1.96 * self.std / math.sqrt(max(self.count, 1)):.2f} "
+            f"ruin={100 * self.ruin_probability:.1f}% [{100 * low:.1f}, {100 * high:.1f}]"
+        )
+
+
+def merge_all(accumulators: Iterable[StreamingStats]) -> StreamingStats:
+    """Folds worker accumulators into one, in order."""
+    accumulators = iter(accumulators)
+    total = next(accumulators)
+    for acc in accumulators:
+        total.merge(acc)
+    return total
@@ -1,12 +1,23 @@
+import copy
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+from src.bets import BetLayout
 
 class BettingStrategy(ABC):
-    """Abstract base class for all betting strategies."""
+    """
+    Abstract base class for all betting strategies.
+
+    A strategy may carry a BetLayout; its bet amount is then the total
+    placed across that layout each spin.
+    """
     
-    def __init__(self, initial_bet: float):
+    def __init__(self, initial_bet: float, layout: Optional[BetLayout] = None):
         self.initial_bet = initial_bet
         self.current_bet = initial_bet
+        self.layout = layout
 
     @abstractmethod
     def update(self, last_result: Dict) -> float:
@@ -41,8 +52,8 @@ class Fibonacci(BettingStrategy):
     Increases bet by moving up the sequence on loss, moves down on win.
     """
     
-    def __init__(self, initial_bet: float):
-        super().__init__(initial_bet)
+    def __init__(self, initial_bet: float, layout: Optional[BetLayout] = None):
+        super().__init__(initial_bet, layout)
         self.sequence = [1, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89]
         self.ptr = 0
 
@@ -53,4 +64,155 @@ class Fibonacci(BettingStrategy):
             self.ptr = min(len(self.sequence) - 1, self.ptr + 1)
         
         self.current_bet = self.initial_bet * self.sequence[self.ptr]
-        return self.current_bet
\ No newline at end of file
+        return self.current_bet
+
+# --- Batch protocol ---
+# A batch strategy holds its state as arrays over many concurrent runs and
+# advances all of them in one call. The engine hands update() the spin
+# outcome as columns mirroring the scalar record: 'pocket' (int index,
+# "00" = 37), 'color' (0 green, 1 red, 2 black), 'bet_amount', 'win' (bool)
+# and 'balance', plus the mask of runs still playing.
+
+class BatchStrategy(ABC):
+    """Abstract base class for strategies that run many lives at once."""
+
+    def __init__(self, initial_bet: float, layout: Optional[BetLayout] = None):
+        self.initial_bet = initial_bet
+        self.layout = layout
+
+    @abstractmethod
+    def reset(self, n_runs: int) -> np.ndarray:
+        """Initialises state for n_runs lives and returns their first bets."""
+        pass
+
+    @abstractmethod
+    def update(self, results: Dict[str, np.ndarray], active: np.ndarray) -> np.ndarray:
+        """
+        Advances the state of the active runs from the last spin's outcome
+        and returns the next bet of every run.
+        """
+        pass
+
+
+class ConstantBetBatch(BatchStrategy):
+    """Array port of ConstantBet."""
+
+    def reset(self, n_runs: int) -> np.ndarray:
+        self.current_bet = np.full(n_runs, float(self.initial_bet))
+        return self.current_bet
+
+    def update(self, results: Dict[str, np.ndarray], active: np.ndarray) -> np.ndarray:
+        return self.current_bet
+
+
+class MartingaleBatch(BatchStrategy):
+    """Array port of Martingale: one current_bet per run."""
+
+    def reset(self, n_runs: int) -> np.ndarray:
+        self.current_bet = np.full(n_runs, float(self.initial_bet))
+        return self.current_bet
+
+    def update(self, results: Dict[str, np.ndarray], active: np.ndarray) -> np.ndarray:
+        next_bet = np.where(results['win'], self.initial_bet, self.current_bet * 2)
+        self.current_bet = np.where(active, next_bet, self.current_bet)
+        return self.current_bet
+
+
+class FibonacciBatch(BatchStrategy):
+    """Array port of Fibonacci: one sequence pointer per run."""
+
+    def __init__(self, initial_bet: float, layout: Optional[BetLayout] = None):
+        super().__init__(initial_bet, layout)
+        self.sequence = np.array([1, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89], dtype=float)
+
+    def reset(self, n_runs: int) -> np.ndarray:
+        self.ptr = np.zeros(n_runs, dtype=np.int64)
+        return self.initial_bet * self.sequence[self.ptr]
+
+    def update(self, results: Dict[str, np.ndarray], active: np.ndarray) -> np.ndarray:
+        next_ptr = np.where(
+            results['win'],
+            np.maximum(0, self.ptr - 2),
+            np.minimum(len(self.sequence) - 1, self.ptr + 1),
+        )
+        self.ptr = np.where(active, next_ptr, self.ptr)
+        return self.initial_bet * self.sequence[self.ptr]
+
+
+class ScalarStrategyAdapter(BatchStrategy):
+    """
+    Runs a legacy scalar strategy in the batch path by keeping one
+    instance per run and replaying each run's outcome as the usual dict.
+    Correct for any BettingStrategy, but pays a Python call per active run.
+
+    Each run's instance is built from strategy_class, or copied from
+    prototype when one is given (keeping any extra constructor arguments).
+    """
+
+    # Must match the colour codes used by the engine
+    COLOR_NAMES = ("green", "red", "black")
+
+    def __init__(self, strategy_class: type, initial_bet: float, layout: Optional[BetLayout] = None,
+                 prototype: Optional[BettingStrategy] = None):
+        super().__init__(initial_bet, layout)
+        self.strategy_class = strategy_class
+        self.prototype = prototype
+
+    def reset(self, n_runs: int) -> np.ndarray:
+        if self.prototype is not None:
+            self.strategies = [copy.deepcopy(self.prototype) for _ in range(n_runs)]
+        else:
+            self.strategies = [self.strategy_class(initial_bet=self.initial_bet) for _ in range(n_runs)]
+        self.current_bet = np.full(n_runs, float(self.initial_bet))
+        return self.current_bet
+
+    def update(self, results: Dict[str, np.ndarray], active: np.ndarray) -> np.ndarray:
+        self.current_bet = self.current_bet.copy()
+        for i in np.flatnonzero(active):
+            pocket = int(results['pocket'][i])
+            self.current_bet[i] = self.strategies[i].update({
+                "pocket": "00" if pocket == 37 else pocket,
+                "color": self.COLOR_NAMES[results['color'][i]],
+                "bet_amount": float(results['bet_amount'][i]),
+                "result": "win" if results['win'][i] else "loss",
+                "balance": float(results['balance'][i]),
+            })
+        return self.current_bet
+
+
+# Exact-class ports; subclasses may override update(), so they go through
+# the adapter instead.
+BATCH_PORTS = {
+    ConstantBet: ConstantBetBatch,
+    Martingale: MartingaleBatch,
+    Fibonacci: FibonacciBatch,
+}
+
+
+def as_batch_strategy(
+    strategy: Union[type, BatchStrategy, BettingStrategy], initial_bet: float
+) -> BatchStrategy:
+    """
+    Resolves what the batch engine should run: a BatchStrategy instance is
+    used as-is, a ported class gets its array implementation and any other
+    BettingStrategy class is wrapped in a ScalarStrategyAdapter.
+
+    A BettingStrategy instance is resolved the same way by its class but
+    keeps its own initial_bet and layout (initial_bet is ignored); without
+    a port, every run plays a copy of it.
+    """
+    if isinstance(strategy, BatchStrategy):
+        return strategy
+    if isinstance(strategy, BettingStrategy):
+        if type(strategy) in BATCH_PORTS:
+            return BATCH_PORTS[type(strategy)](strategy.initial_bet, strategy.layout)
+        return ScalarStrategyAdapter(type(strategy), strategy.initial_bet, strategy.layout, prototype=strategy)
+    if not isinstance(strategy, type):
+        raise ValueError(
+            f"Expected a strategy class or a BatchStrategy / BettingStrategy instance, got {strategy!r}"
+        )
+    if strategy in BATCH_PORTS:
+        return BATCH_PORTS[strategy](initial_bet)
+    if issubclass(strategy, BatchStrategy):
+        return strategy(initial_bet)
+    return ScalarStrategyAdapter(strategy, initial_bet)
@@ -0,0 +1,137 @@
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.engine import RouletteEngine
+from src.stats import StreamingStats
+from src.strategies import ConstantBet
+
+# Grid axes and the value used when an axis is left out
+SWEEP_DEFAULTS = {
+    "strategy": [ConstantBet],
+    "wheel_type": ["European"],
+    "initial_capital": [1000],
+    "initial_bet": [10],
+    "n_spins": [200],
+}
+
+
+def cell_key(config: Dict, seed: int) -> str:
+    """Stable hash of a cell's configuration plus the sweep seed."""
+    payload = json.dumps({**config, "seed": seed}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def run_cell(strategy_class: type, config: Dict, seed: int, key: str) -> Dict:
+    """
+    Simulates one grid cell with the batch engine and summarises it.
+
+    The stream is derived from the sweep seed and the cell's own hash, so a
+    cell gives the same answer whichever grid it appears in.
+    """
+    start = time.perf_counter()
+    engine = RouletteEngine(type=config["wheel_type"], initial_capital=config["initial_capital"])
+    result = engine.simulate_batch(
+        config["n_runs"], config["n_spins"], strategy_class,
+        initial_bet=config["initial_bet"],
+        seed=np.random.SeedSequence([seed, int(key[:16], 16)]),
+    )
+    stats = StreamingStats(config["n_spins"])
+    stats.add_batch(result.final_balances, result.ruin_spins)
+    low, high = stats.ruin_interval()
+    return {
+        "mean_final": stats.mean,
+        "std_final": stats.std,
+        "min_final": stats.min,
+        "max_final": stats.max,
+        "p05_final": float(np.quantile(result.final_balances, 0.05)),
+        "median_final": float(np.median(result.final_balances)),
+        "p95_final": float(np.quantile(result.final_balances, 0.95)),
+        "ruin_probability": stats.ruin_probability,
+        "ruin_ci_low": low,
+        "ruin_ci_high": high,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def _run_cell(args):
+    return run_cell(*args)
+
+
+def run_sweep(
+    grid: Dict[str, Sequence],
+    n_runs: int = 10000,
+    seed: int = 0,
+    cache_dir: Optional[str] = ".sweep_cache",
+    n_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Runs every combination of the grid axes (strategy, wheel_type,
+    initial_capital, initial_bet, n_spins) and returns one tidy row per cell.
+
+    Each cell's summary is cached as JSON under the hash of its
+    configuration plus seed, so rerunning an extended grid only simulates
+    the new cells. Missing cells are spread across a process pool.
+    """
+    unknown = set(grid) - set(SWEEP_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown sweep axes: {sorted(unknown)}")
+    axes = {name: list(grid.get(name, default)) for name, default in SWEEP_DEFAULTS.items()}
+
+    cells = []
+    for values in itertools.product(*axes.values()):
+        cell = dict(zip(axes, values))
+        strategy_class = cell["strategy"]
+        config = {**cell, "strategy": f"{strategy_class.__module__}.{strategy_class.__qualname__}", "n_runs": n_runs}
+        cells.append((strategy_class, config, cell_key(config, seed)))
+
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    summaries: Dict[str, Dict] = {}
+    for _, _, key in cells:
+        path = os.path.join(cache_dir, f"{key}.json") if cache_dir is not None else None
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                summaries[key] = json.load(f)["summary"]
+
+    missing = [c for c in cells if c[2] not in summaries]
+    # The same cell may appear twice if an axis lists a value twice
+    missing = list({key: (s, config, seed, key) for s, config, key in missing}.values())
+    print(f"--- Sweep: {len(cells)} cells, {len(cells) - len(missing)} cached, {len(missing)} to run ---")
+
+    if missing:
+        if n_workers == 1 or len(missing) == 1:
+            fresh = list(map(_run_cell, missing))
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                fresh = list(pool.map(_run_cell, missing))
+        for (_, config, _, key), summary in zip(missing, fresh):
+            summaries[key] = summary
+            if cache_dir is not None:
+                tmp = os.path.join(cache_dir, f"{key}.json.tmp")
+                with open(tmp, "w") as f:
+                    json.dump({"config": config, "seed": seed, "summary": summary}, f, indent=2)
+                os.replace(tmp, os.path.join(cache_dir, f"{key}.json"))
+
+    fresh_keys = {m[3] for m in missing}
+    rows: List[Dict] = []
+    for strategy_class, config, key in cells:
+        rows.append({
+            "strategy": strategy_class.__name__,
+            "wheel_type": config["wheel_type"],
+            "initial_capital": config["initial_capital"],
+            "initial_bet": config["initial_bet"],
+            "n_spins": config["n_spins"],
+            "n_runs": n_runs,
+            **summaries[key],
+            "cached": key not in fresh_keys,
+        })
+    return pd.DataFrame(rows)
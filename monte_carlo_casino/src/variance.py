@@ -0,0 +1,65 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.engine import RouletteEngine
+
+
+def compare_strategies(
+    strategies: Sequence[type],
+    n_runs: int = 10000,
+    n_spins: int = 200,
+    seed: Optional[int] = None,
+    antithetic: bool = False,
+    baseline: int = 0,
+    engine: Optional[RouletteEngine] = None,
+    initial_bet: float = 10,
+) -> pd.DataFrame:
+    """
+    Evaluates every strategy against the same pre-drawn pocket sequences
+    (common random numbers) and reports how much that sharpens the
+    comparison with the baseline strategy.
+
+    With antithetic=True the runs come in mirrored pairs (see
+    RouletteEngine.draw_pockets) and each pair's average is the sampling
+    unit. 'Variance Reduction' is the variance of the estimated difference
+    under independent sampling divided by the variance actually achieved;
+    'Effective Sample Size' is the number of independent runs per strategy
+    that would give the same precision.
+    """
+    engine = engine or RouletteEngine()
+    pockets = engine.draw_pockets(n_runs, n_spins, seed, antithetic=antithetic)
+
+    finals: List[np.ndarray] = [
+        engine.simulate_batch(n_runs, n_spins, s, initial_bet=initial_bet, pockets=pockets).final_balances
+        for s in strategies
+    ]
+    # Sampling units: single runs, or antithetic pair averages
+    units = [(f[: n_runs // 2] + f[n_runs // 2:]) / 2 if antithetic else f for f in finals]
+    n_units = len(units[0])
+
+    base_finals, base_units = finals[baseline], units[baseline]
+    rows = []
+    for strategy, f, u in zip(strategies, finals, units):
+        row = {
+            "Strategy": strategy.__name__,
+            "Avg Final Balance": u.mean(),
+            "SE": np.sqrt(u.var(ddof=1) / n_units),
+            "SE (independent)": np.sqrt(f.var(ddof=1) / n_runs),
+        }
+        if u is not base_units:
+            diff = u - base_units
+            var_paired = diff.var(ddof=1) / n_units
+            var_independent = (f.var(ddof=1) + base_finals.var(ddof=1)) / n_runs
+            reduction = var_independent / var_paired if var_paired > 0 else np.inf
+            row.update({
+                "Diff vs Baseline": diff.mean(),
+                "SE Diff": np.sqrt(var_paired),
+                "SE Diff (independent)": np.sqrt(var_independent),
+                "Variance Reduction": reduction,
+                "Effective Sample Size": n_runs * reduction,
+            })
+        rows.append(row)
+
+    return pd.DataFrame(rows)
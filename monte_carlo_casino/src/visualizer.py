@@ -1,7 +1,26 @@
+import os
+import re
+import warnings
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-from typing import List, Dict
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import LogNorm
+from matplotlib.figure import Figure
+from typing import Iterable, List, Dict, Optional, Sequence, Tuple, Union
+
+from src.campaign import CampaignReader
+from src.recorder import ColumnarHistory
+
+# Anything the density plots can consume: one (n_runs, n_spins) balance
+# matrix, an iterable of such chunks, a list of ColumnarHistory records or
+# a campaign on disk, read one chunk at a time
+BalanceSource = Union[np.ndarray, Iterable[np.ndarray], Sequence[ColumnarHistory], CampaignReader]
+
+# Balances beyond balance_range may widen the histogram to at most this many
+# times the requested bins (split evenly below and above the range)
+MAX_BIN_GROWTH = 4
 
 class AnalyticsVisualizer:
     """
@@ -9,46 +28,238 @@ class AnalyticsVisualizer:
     Focuses on 'Wealth Trajectory' and 'Risk of Ruin'.
     """
 
-    def __init__(self, style: str = "whitegrid"):
+    def __init__(self, style: str = "whitegrid", output_dir: Optional[str] = None, file_format: str = "png"):
+        """
+        Args:
+            style: Seaborn theme.
+            output_dir: When set, figures are written here as files instead
+                of being shown. They are drawn on their own Agg canvas, so
+                batch jobs render without a display and pyplot's global
+                backend is left alone.
+            file_format: Image format for saved figures, e.g. 'png' or 'svg'.
+        """
         sns.set_theme(style=style)
         self.palette = "viridis"
+        self.output_dir = output_dir
+        self.file_format = file_format
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
 
-    def plot_wealth_trajectories(self, all_runs: List[List[Dict]], strategy_name: str):
+    def _figure(self, figsize: Tuple[float, float]):
+        """A new (figure, axes): a pyplot window, or a standalone Agg figure in headless mode."""
+        if self.output_dir is None:
+            return plt.subplots(figsize=figsize)
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        return fig, fig.add_subplot()
+
+    def _finish(self, fig, name: str) -> Optional[str]:
+        """Shows the figure, or saves it in headless mode."""
+        if self.output_dir is None:
+            plt.show()
+            return None
+        slug = re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+        path = os.path.join(self.output_dir, f"{slug}.{self.file_format}")
+        fig.savefig(path, format=self.file_format, dpi=150)
+        return path
+
+    def plot_wealth_trajectories(
+        self,
+        all_runs: Sequence[Union[List[Dict], ColumnarHistory]],
+        strategy_name: str,
+    ):
         """
         Plots multiple simulation paths to show the variance of a strategy.
         
         Args:
-            all_runs: A list of 'history' lists from the engine.
+            all_runs: A list of 'history' lists from the engine, or the
+                ColumnarHistory records of a 'full'/'balance' recorder.
             strategy_name: The label for the plot title.
         """
-        plt.figure(figsize=(12, 6))
+        fig, ax = self._figure((12, 6))
         
         for i, run in enumerate(all_runs):
-            df = pd.DataFrame(run)
+            if isinstance(run, ColumnarHistory):
+                index, balance = np.arange(len(run)), run.balance
+            else:
+                df = pd.DataFrame(run)
+                index, balance = df.index, df['balance']
             # We use alpha=0.3 to show density where paths overlap
-            plt.plot(df.index, df['balance'], alpha=0.3, color='royalblue', linewidth=1)
+            ax.plot(index, balance, alpha=0.3, color='royalblue', linewidth=1)
 
-        plt.axhline(y=all_runs[0][0]['balance'], color='red', linestyle='--', label='Starting Capital')
-        plt.title(f"Monte Carlo Simulation: {strategy_name} Wealth Trajectory", fontsize=15)
-        plt.xlabel("Number of Spins")
-        plt.ylabel("Bankroll ($)")
-        plt.legend()
-        plt.tight_layout()
-        plt.show()
+        first = all_runs[0]
+        start = first.initial_capital if isinstance(first, ColumnarHistory) else first[0]['balance']
+        ax.axhline(y=start, color='red', linestyle='--', label='Starting Capital')
+        ax.set_title(f"Monte Carlo Simulation: {strategy_name} Wealth Trajectory", fontsize=15)
+        ax.set_xlabel("Number of Spins")
+        ax.set_ylabel("Bankroll ($)")
+        ax.legend()
+        fig.tight_layout()
+        return self._finish(fig, f"{strategy_name} trajectories")
 
     def plot_final_distribution(self, final_balances: List[float]):
         """
         Creates a histogram/KDE of the final outcomes to show probability distribution.
         """
-        plt.figure(figsize=(10, 5))
-        sns.histplot(final_balances, kde=True, color="seagreen", bins=30)
+        fig, ax = self._figure((10, 5))
+        sns.histplot(final_balances, kde=True, color="seagreen", bins=30, ax=ax)
         
         # Calculate Expected Value E[X]
         ev = sum(final_balances) / len(final_balances)
-        plt.axvline(ev, color='orange', linestyle='-', label=f'Expected Value: ${ev:.2f}')
+        ax.axvline(ev, color='orange', linestyle='-', label=f'Expected Value: ${ev:.2f}')
         
-        plt.title("Distribution of Final Bankrolls", fontsize=14)
-        plt.xlabel("Ending Balance ($)")
-        plt.ylabel("Frequency")
-        plt.legend()
-        plt.show()
\ No newline at end of file
+        ax.set_title("Distribution of Final Bankrolls", fontsize=14)
+        ax.set_xlabel("Ending Balance ($)")
+        ax.set_ylabel("Frequency")
+        ax.legend()
+        return self._finish(fig, "final distribution")
+
+    @staticmethod
+    def _balance_chunks(balances: BalanceSource) -> Iterable[np.ndarray]:
+        if isinstance(balances, CampaignReader):
+            return balances.iter_balances()
+        if isinstance(balances, np.ndarray):
+            return [balances]
+        if isinstance(balances, Sequence) and balances and isinstance(balances[0], ColumnarHistory):
+            # Ruined runs are shorter; hold their last balance to the horizon
+            width = max(len(run) for run in balances)
+            matrix = np.empty((len(balances), width))
+            for i, run in enumerate(balances):
+                matrix[i, :len(run)] = run.balance
+                matrix[i, len(run):] = run.balance[-1] if len(run) else run.initial_capital
+            return [matrix]
+        return balances
+
+    def wealth_histogram(
+        self,
+        balances: BalanceSource,
+        bins: int = 400,
+        balance_range: Optional[Tuple[float, float]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Bins every trajectory into a (spin x balance) count matrix in one
+        pass over the data, so chunks can stream from disk.
+
+        balance_range is required when balances is a one-shot iterator;
+        otherwise it defaults to the observed min and max. It fixes the bin
+        width; a later chunk reaching beyond it (or running more spins)
+        grows the matrix by whole bins, so the returned edges may extend
+        past the range. Growth stops at MAX_BIN_GROWTH * bins bins in all,
+        so one extreme balance (say a martingale blow-up) cannot force a
+        huge allocation; balances past that are clipped into the outermost
+        bins with a RuntimeWarning.
+        """
+        if isinstance(balances, CampaignReader):
+            balance_range = balance_range or balances.balance_range
+        chunks = self._balance_chunks(balances)
+        if balance_range is None:
+            if iter(chunks) is chunks:
+                raise ValueError("balance_range is required when streaming balance chunks.")
+            balance_range = (min(c.min() for c in chunks), max(c.max() for c in chunks))
+        low, high = balance_range
+        if high <= low:
+            high = low + 1.0
+
+        # counts[:, j] holds bin first_bin + j, counted in bin widths from low
+        counts = np.zeros((0, bins), dtype=np.int64)
+        first_bin = 0
+        extra = (MAX_BIN_GROWTH - 1) * bins
+        min_bin, max_bin = -(extra // 2), bins - 1 + extra - extra // 2
+        clipped = 0
+        for chunk in chunks:
+            if chunk.size == 0:
+                continue
+            n_spins = chunk.shape[1]
+            position = np.floor((chunk - low) / (high - low) * bins)
+            # The top edge belongs to the last bin, as in np.histogram
+            position[(position == bins) & (chunk <= high)] = bins - 1
+            clipped += int(np.count_nonzero((position < min_bin) | (position > max_bin)))
+            idx = np.clip(position, min_bin, max_bin).astype(np.int64)
+            lo_bin = min(first_bin, int(idx.min()))
+            hi_bin = max(first_bin + counts.shape[1], int(idx.max()) + 1)
+            if lo_bin < first_bin or hi_bin > first_bin + counts.shape[1] or n_spins > len(counts):
+                counts = np.pad(counts, (
+                    (0, max(0, n_spins - len(counts))),
+                    (first_bin - lo_bin, hi_bin - first_bin - counts.shape[1]),
+                ))
+                first_bin = lo_bin
+            n_bins = counts.shape[1]
+            # Flattened (spin, bin) index so one bincount covers the chunk
+            flat = (np.arange(n_spins) * n_bins + (idx - first_bin)).ravel()
+            counts[:n_spins] += np.bincount(flat, minlength=n_spins * n_bins).reshape(n_spins, n_bins)
+
+        if len(counts) == 0:
+            raise ValueError("No balances to plot.")
+        if clipped:
+            warnings.warn(
+                f"{clipped} balances lie beyond {MAX_BIN_GROWTH}x the balance range and were "
+                "clipped into the outermost bins; pass a wider balance_range to see them",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+        edges = low + (high - low) / bins * np.arange(first_bin, first_bin + counts.shape[1] + 1)
+        return counts, edges
+
+    @staticmethod
+    def histogram_quantiles(counts: np.ndarray, edges: np.ndarray, qs: Sequence[float]) -> np.ndarray:
+        """Per-spin quantiles read off the binned CDF, shape (len(qs), n_spins)."""
+        cdf = np.cumsum(counts, axis=1) / counts.sum(axis=1, keepdims=True)
+        out = np.empty((len(qs), len(counts)))
+        for i, q in enumerate(qs):
+            bin_idx = (cdf < q).sum(axis=1).clip(0, len(edges) - 2)
+            out[i] = (edges[bin_idx] + edges[bin_idx + 1]) / 2
+        return out
+
+    def plot_wealth_density(
+        self,
+        balances: BalanceSource,
+        strategy_name: str,
+        mode: str = "histogram",
+        bins: int = 400,
+        balance_range: Optional[Tuple[float, float]] = None,
+        initial_capital: Optional[float] = None,
+    ):
+        """
+        Renders any number of trajectories at a fixed cost per path.
+
+        Args:
+            balances: A balance matrix (e.g. BatchResult.balances), an
+                iterable of matrix chunks, ColumnarHistory records, or a
+                CampaignReader whose chunks are loaded one at a time.
+            strategy_name: The label for the plot title.
+            mode: 'histogram' for a log-scaled (spin x balance) heatmap, or
+                'fan' for 5/25/50/75/95% quantile bands.
+            bins: Number of balance bins.
+            balance_range: Fixed (low, high) balance axis; needed when
+                streaming chunks from an iterator.
+            initial_capital: Draws the starting-capital reference line.
+        """
+        counts, edges = self.wealth_histogram(balances, bins, balance_range)
+        if mode not in ("histogram", "fan"):
+            raise ValueError(f"Unknown density mode: {mode} (expected 'histogram' or 'fan')")
+        spins = np.arange(1, len(counts) + 1)
+        fig, ax = self._figure((12, 6))
+
+        if mode == "histogram":
+            masked = np.ma.masked_equal(counts.T, 0)
+            mesh = ax.pcolormesh(
+                np.arange(len(counts) + 1) + 0.5, edges, masked,
+                cmap=self.palette, norm=LogNorm(), shading="flat",
+            )
+            fig.colorbar(mesh, ax=ax, label="Paths")
+            ax.grid(False)
+        else:
+            q05, q25, q50, q75, q95 = self.histogram_quantiles(counts, edges, [0.05, 0.25, 0.5, 0.75, 0.95])
+            ax.fill_between(spins, q05, q95, color='royalblue', alpha=0.2, label='5-95%')
+            ax.fill_between(spins, q25, q75, color='royalblue', alpha=0.4, label='25-75%')
+            ax.plot(spins, q50, color='navy', linewidth=1.5, label='Median')
+
+        if initial_capital is not None:
+            ax.axhline(y=initial_capital, color='red', linestyle='--', label='Starting Capital')
+        ax.set_title(f"Monte Carlo Simulation: {strategy_name} Wealth Density ({int(counts[0].sum())} paths)", fontsize=15)
+        ax.set_xlabel("Number of Spins")
+        ax.set_ylabel("Bankroll ($)")
+        if mode == "fan" or initial_capital is not None:
+            ax.legend()
+        fig.tight_layout()
+        return self._finish(fig, f"{strategy_name} density {mode}")
\ No newline at end of file